@@ -8,8 +8,10 @@ from airflow.sensors.external_task import ExternalTaskSensor
 from airflow.models import Variable
 
 from utils.extractors import extract_alpha_vantage_data, extract_yahoo_finance_data
-from utils.transformers import transform_stock_data, merge_stock_datasets
-from utils.validators import validate_raw_data, validate_transformed_data
+from utils.pipeline import validate_extracted_data
+from utils.transformers import transform_and_merge_stock_data
+from utils.loaders import GCS_UPLOAD_CHUNK_SIZE, STOCK_DATA_BQ_SCHEMA, create_bigquery_table_if_not_exists
+from utils.validators import get_transformed_data_schema, validate_transformed_data
 from plugins.custom_operators.data_quality_operator import DataQualityOperator
 
 # Default arguments for the DAG
@@ -29,6 +31,8 @@ STOCK_SYMBOLS = config.get('stock_symbols', ['AAPL', 'MSFT', 'GOOGL', 'AMZN'])
 BUCKET_NAME = config.get('gcs_bucket')
 BQ_DATASET = config.get('bigquery_dataset')
 BQ_TABLE = config.get('bigquery_table')
+# Alpha Vantage requests allowed per minute (5 on the free tier)
+ALPHA_VANTAGE_RATE_LIMIT = int(Variable.get("alpha_vantage_rate_limit", default_var=5))
 
 with DAG(
     'stock_data_etl_pipeline',
@@ -41,112 +45,117 @@ with DAG(
     max_active_runs=1,
 ) as dag:
 
-    # Extract data from Alpha Vantage API
+    # Extract data from Alpha Vantage API in a single task, the extractor
+    # requests all symbols concurrently and throttles them to the key's
+    # per-minute rate limit
     extract_alpha_vantage_task = PythonOperator(
         task_id='extract_alpha_vantage_data',
         python_callable=extract_alpha_vantage_data,
         op_kwargs={
             'symbols': STOCK_SYMBOLS,
-            'output_path': '/tmp/alpha_vantage_data.csv',
+            'output_path': '/tmp/alpha_vantage/extracted.parquet',
             'api_key': Variable.get("alpha_vantage_api_key"),
+            'requests_per_minute': ALPHA_VANTAGE_RATE_LIMIT,
         },
     )
 
-    # Extract data from Yahoo Finance API
+    # Extract data from Yahoo Finance API, all symbols in one batched download
     extract_yahoo_finance_task = PythonOperator(
         task_id='extract_yahoo_finance_data',
         python_callable=extract_yahoo_finance_data,
         op_kwargs={
             'symbols': STOCK_SYMBOLS,
-            'output_path': '/tmp/yahoo_finance_data.csv',
+            'output_path': '/tmp/yahoo_finance/extracted.parquet',
             'period': '1mo'  # Get 1 month of data
         },
     )
 
-    # Validate raw data
-    validate_raw_alpha_vantage_data = DataQualityOperator(
-        task_id='validate_raw_alpha_vantage_data',
-        data_path='/tmp/alpha_vantage_data.csv',
-        validation_callable=validate_raw_data,
-        validation_type='alpha_vantage'
-    )
-
-    validate_raw_yahoo_data = DataQualityOperator(
-        task_id='validate_raw_yahoo_data',
-        data_path='/tmp/yahoo_finance_data.csv',
-        validation_callable=validate_raw_data,
-        validation_type='yahoo_finance'
-    )
-
-    # Transform Alpha Vantage data
-    transform_alpha_vantage_task = PythonOperator(
-        task_id='transform_alpha_vantage_data',
-        python_callable=transform_stock_data,
+    # Validate the extract of each source in memory before saving it where
+    # the transform task reads it
+    validate_alpha_vantage_task = PythonOperator(
+        task_id='validate_alpha_vantage_data',
+        python_callable=validate_extracted_data,
         op_kwargs={
-            'input_path': '/tmp/alpha_vantage_data.csv',
-            'output_path': '/tmp/transformed_alpha_vantage_data.csv',
-            'source': 'alpha_vantage'
+            'input_path': extract_alpha_vantage_task.output,
+            'output_path': '/tmp/alpha_vantage_data.parquet',
+            'source': 'alpha_vantage',
         },
     )
 
-    # Transform Yahoo Finance data
-    transform_yahoo_finance_task = PythonOperator(
-        task_id='transform_yahoo_finance_data',
-        python_callable=transform_stock_data,
+    validate_yahoo_finance_task = PythonOperator(
+        task_id='validate_yahoo_finance_data',
+        python_callable=validate_extracted_data,
         op_kwargs={
-            'input_path': '/tmp/yahoo_finance_data.csv',
-            'output_path': '/tmp/transformed_yahoo_finance_data.csv',
-            'source': 'yahoo_finance'
+            'input_path': extract_yahoo_finance_task.output,
+            'output_path': '/tmp/yahoo_finance_data.parquet',
+            'source': 'yahoo_finance',
         },
     )
 
-    # Merge transformed datasets
-    merge_datasets_task = PythonOperator(
-        task_id='merge_datasets',
-        python_callable=merge_stock_datasets,
+    # Transform the data of both sources and merge it in a single task,
+    # keeping the transformed data in memory between the two steps
+    transform_and_merge_task = PythonOperator(
+        task_id='transform_and_merge_data',
+        python_callable=transform_and_merge_stock_data,
         op_kwargs={
-            'input_paths': [
-                '/tmp/transformed_alpha_vantage_data.csv',
-                '/tmp/transformed_yahoo_finance_data.csv'
-            ],
-            'output_path': '/tmp/merged_stock_data.csv'
+            'input_paths': {
+                'alpha_vantage': '/tmp/alpha_vantage_data.parquet',
+                'yahoo_finance': '/tmp/yahoo_finance_data.parquet',
+            },
+            'output_path': '/tmp/merged_stock_data.parquet'
         },
     )
 
     # Validate transformed data
     validate_transformed_data_task = DataQualityOperator(
         task_id='validate_transformed_data',
-        data_path='/tmp/merged_stock_data.csv',
-        validation_callable=validate_transformed_data
+        data_path='/tmp/merged_stock_data.parquet',
+        validation_callable=validate_transformed_data,
+        # Only read the columns the transformed data schema checks
+        columns=list(get_transformed_data_schema().columns),
     )
 
     # Upload merged data to GCS
     upload_to_gcs_task = LocalFilesystemToGCSOperator(
         task_id='upload_to_gcs',
-        src='/tmp/merged_stock_data.csv',
-        dst=f'stock_data/{datetime.today().strftime("%Y-%m-%d")}/merged_stock_data.csv',
+        src='/tmp/merged_stock_data.parquet',
+        dst=f'stock_data/{datetime.today().strftime("%Y-%m-%d")}/merged_stock_data.parquet',
         bucket=BUCKET_NAME,
+        # Resumable upload in chunks, a failed chunk is retried on its own
+        chunk_size=GCS_UPLOAD_CHUNK_SIZE,
         gcp_conn_id='google_cloud_default',
     )
 
+    # Create the target table on first run, partitioned by day and clustered
+    # by symbol so queries filtered on date or symbol scan less data
+    create_bigquery_table_task = PythonOperator(
+        task_id='create_bigquery_table',
+        python_callable=create_bigquery_table_if_not_exists,
+        op_kwargs={
+            'table_id': f'{BQ_DATASET}.{BQ_TABLE}',
+            'schema': STOCK_DATA_BQ_SCHEMA,
+            'partition_field': 'date',
+            'cluster_fields': ['symbol'],
+        },
+    )
+
     # Load data from GCS to BigQuery
     load_to_bigquery_task = GCSToBigQueryOperator(
         task_id='load_to_bigquery',
         bucket=BUCKET_NAME,
-        source_objects=[f'stock_data/{datetime.today().strftime("%Y-%m-%d")}/merged_stock_data.csv'],
+        source_objects=[f'stock_data/{datetime.today().strftime("%Y-%m-%d")}/merged_stock_data.parquet'],
         destination_project_dataset_table=f'{BQ_DATASET}.{BQ_TABLE}',
-        schema_fields=[
-            {'name': 'date', 'type': 'DATE', 'mode': 'REQUIRED'},
-            {'name': 'symbol', 'type': 'STRING', 'mode': 'REQUIRED'},
-            {'name': 'open', 'type': 'FLOAT', 'mode': 'NULLABLE'},
-            {'name': 'high', 'type': 'FLOAT', 'mode': 'NULLABLE'},
-            {'name': 'low', 'type': 'FLOAT', 'mode': 'NULLABLE'},
-            {'name': 'close', 'type': 'FLOAT', 'mode': 'REQUIRED'},
-            {'name': 'volume', 'type': 'INTEGER', 'mode': 'NULLABLE'},
-            {'name': 'data_source', 'type': 'STRING', 'mode': 'REQUIRED'},
-            {'name': 'processed_at', 'type': 'TIMESTAMP', 'mode': 'REQUIRED'},
-        ],
+        # Column types come from the Parquet file itself
+        source_format='PARQUET',
+        autodetect=True,
         write_disposition='WRITE_APPEND',
-        skip_leading_rows=1,
         gcp_conn_id='google_cloud_default',
     )
+
+    # Define task dependencies, the table must exist with its partitioning
+    # and clustering before the first load or autodetect creates it without
+    extract_alpha_vantage_task >> validate_alpha_vantage_task
+    extract_yahoo_finance_task >> validate_yahoo_finance_task
+    [validate_alpha_vantage_task, validate_yahoo_finance_task] >> transform_and_merge_task
+    transform_and_merge_task >> validate_transformed_data_task >> upload_to_gcs_task >> load_to_bigquery_task
+    create_bigquery_table_task >> load_to_bigquery_task
@@ -1,63 +1,69 @@
-import os
+import asyncio
 import logging
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
 
+import requests
 import yfinance as yf
-from alpha_vantage.timeseries import TimeSeries
+from alpha_vantage.async_support.timeseries import TimeSeries
+
+from plugins.helpers.columns import CATEGORICAL_COLUMNS
+from .file_io import STOCK_DATA_DTYPES, read_dataframe, write_dataframe
 
 logger = logging.getLogger(__name__)
 
+# Date columns of extracted data read back from text files
+EXTRACTED_DATA_DATE_COLUMNS = ['date', 'extracted_at']
+
 
-def extract_alpha_vantage_data(symbols: List[str], output_path: str, api_key: str) -> str:
+def extract_alpha_vantage_data(
+        symbols: List[str],
+        output_path: str,
+        api_key: str,
+        requests_per_minute: int = 5
+) -> str:
     """
     Extract daily stock data from Alpha Vantage API.
 
+    Requests for all symbols are issued concurrently and throttled to the
+    API key's rate limit instead of sleeping between sequential calls.
+
     Args:
         symbols: List of stock symbols to extract data for
-        output_path: Path to save the extracted data
+        output_path: Path to save the extracted data (.csv, .csv.gz, .parquet or .feather)
         api_key: Alpha Vantage API key
+        requests_per_minute: Request quota of the API key (free tier allows 5 calls per minute)
 
     Returns:
         Path to the saved data file
     """
-    logger.info(f"Extracting Alpha Vantage data for symbols: {symbols}")
+    combined_data = fetch_alpha_vantage_data(symbols, api_key, requests_per_minute)
 
-    # Initialize TimeSeries client
-    ts = TimeSeries(key=api_key, output_format='pandas')
+    # Save in the format given by the output path's extension
+    write_dataframe(combined_data, output_path)
 
-    # Get data for each symbol and combine into a single DataFrame
-    all_data = []
+    logger.info(f"Extracted {len(combined_data)} records to {output_path}")
 
-    for symbol in symbols:
-        try:
-            # Get daily time series data
-            data, meta_data = ts.get_daily(symbol=symbol, outputsize='compact')
+    return output_path
 
-            # Reset index to make date a column and add symbol
-            data = data.reset_index()
-            data['symbol'] = symbol
 
-            # Rename columns to standardized format
-            data = data.rename(columns={
-                'date': 'date',
-                '1. open': 'open',
-                '2. high': 'high',
-                '3. low': 'low',
-                '4. close': 'close',
-                '5. volume': 'volume'
-            })
+def fetch_alpha_vantage_data(symbols: List[str], api_key: str, requests_per_minute: int = 5) -> pd.DataFrame:
+    """
+    Fetch daily stock data from Alpha Vantage API into a DataFrame.
 
-            all_data.append(data)
+    Args:
+        symbols: List of stock symbols to extract data for
+        api_key: Alpha Vantage API key
+        requests_per_minute: Request quota of the API key (free tier allows 5 calls per minute)
 
-            # Respect API rate limits
-            import time
-            time.sleep(12)  # Alpha Vantage free tier allows 5 calls per minute
+    Returns:
+        DataFrame with the data of all extracted symbols
+    """
+    logger.info(f"Extracting Alpha Vantage data for symbols: {symbols}")
 
-        except Exception as e:
-            logger.error(f"Error extracting data for {symbol}: {e}")
-            continue
+    # Fetch all symbols concurrently and drop the ones that failed
+    results = asyncio.run(_fetch_alpha_vantage_daily(symbols, api_key, requests_per_minute))
+    all_data = [data for data in results if data is not None]
 
     if not all_data:
         raise ValueError("Failed to extract any data from Alpha Vantage")
@@ -67,78 +73,181 @@ def extract_alpha_vantage_data(symbols: List[str], output_path: str, api_key: st
 
     # Add source and timestamp
     combined_data['data_source'] = 'alpha_vantage'
-    combined_data['extracted_at'] = datetime.now().isoformat()
+    combined_data['extracted_at'] = pd.Timestamp.now(tz='UTC')
+    combined_data[CATEGORICAL_COLUMNS] = combined_data[CATEGORICAL_COLUMNS].astype('category')
 
-    # Save to CSV
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    combined_data.to_csv(output_path, index=False)
+    return combined_data
 
-    logger.info(f"Extracted {len(combined_data)} records to {output_path}")
 
-    return output_path
+async def _fetch_alpha_vantage_daily(
+        symbols: List[str],
+        api_key: str,
+        requests_per_minute: int
+) -> List[Optional[pd.DataFrame]]:
+    """
+    Fetch daily time series for all symbols concurrently.
+
+    A semaphore sized to the per-minute quota bounds the number of requests;
+    each slot is only handed back 60 seconds after it was taken, so at most
+    ``requests_per_minute`` calls are started in any one-minute window.
+
+    Args:
+        symbols: List of stock symbols to extract data for
+        api_key: Alpha Vantage API key
+        requests_per_minute: Request quota of the API key
+
+    Returns:
+        List of DataFrames in the order of ``symbols`` (None for failed symbols)
+    """
+    # Initialize TimeSeries client, shared by all requests
+    ts = TimeSeries(key=api_key, output_format='pandas')
+    semaphore = asyncio.Semaphore(requests_per_minute)
+    loop = asyncio.get_running_loop()
 
+    async def _fetch(symbol: str) -> Optional[pd.DataFrame]:
+        # Respect API rate limits
+        await semaphore.acquire()
+        loop.call_later(60, semaphore.release)
 
-def extract_yahoo_finance_data(symbols: List[str], output_path: str, period: str = '1mo') -> str:
+        try:
+            # Get daily time series data
+            data, meta_data = await ts.get_daily(symbol=symbol, outputsize='compact')
+        except Exception as e:
+            logger.error(f"Error extracting data for {symbol}: {e}")
+            return None
+
+        # Reset index to make date a column and add symbol
+        data = data.reset_index()
+        data['symbol'] = symbol
+
+        # Rename columns to standardized format
+        data = data.rename(columns={
+            'date': 'date',
+            '1. open': 'open',
+            '2. high': 'high',
+            '3. low': 'low',
+            '4. close': 'close',
+            '5. volume': 'volume'
+        })
+
+        # The API returns dates as strings and every value as float
+        data['date'] = pd.to_datetime(data['date'])
+        data['volume'] = data['volume'].astype('int64')
+
+        return data
+
+    try:
+        return await asyncio.gather(*[_fetch(symbol) for symbol in symbols])
+    finally:
+        await ts.close()
+
+
+def extract_yahoo_finance_data(
+        symbols: List[str],
+        output_path: str,
+        period: str = '1mo',
+        session: Optional[requests.Session] = None
+) -> str:
     """
     Extract stock data from Yahoo Finance API.
 
     Args:
         symbols: List of stock symbols to extract data for
-        output_path: Path to save the extracted data
+        output_path: Path to save the extracted data (.csv, .csv.gz, .parquet or .feather)
         period: Time period to extract (e.g., '1d', '1mo', '1y')
+        session: HTTP session to reuse for all requests (optional)
 
     Returns:
         Path to the saved data file
     """
-    logger.info(f"Extracting Yahoo Finance data for symbols: {symbols}")
+    combined_data = fetch_yahoo_finance_data(symbols, period, session)
 
-    # Get data for each symbol and combine into a single DataFrame
-    all_data = []
+    # Save in the format given by the output path's extension
+    write_dataframe(combined_data, output_path)
 
-    for symbol in symbols:
-        try:
-            # Get data from Yahoo Finance
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(period=period)
-
-            # Reset index to make date a column and add symbol
-            data = data.reset_index()
-            data['symbol'] = symbol
-
-            # Rename columns to standardized format (Yahoo Finance columns are already capitalized)
-            data = data.rename(columns={
-                'Date': 'date',
-                'Open': 'open',
-                'High': 'high',
-                'Low': 'low',
-                'Close': 'close',
-                'Volume': 'volume'
-            })
-
-            all_data.append(data)
+    logger.info(f"Extracted {len(combined_data)} records to {output_path}")
 
-        except Exception as e:
-            logger.error(f"Error extracting data for {symbol}: {e}")
-            continue
+    return output_path
 
-    if not all_data:
+
+def fetch_yahoo_finance_data(
+        symbols: List[str],
+        period: str = '1mo',
+        session: Optional[requests.Session] = None
+) -> pd.DataFrame:
+    """
+    Fetch stock data from Yahoo Finance API into a DataFrame.
+
+    Args:
+        symbols: List of stock symbols to extract data for
+        period: Time period to extract (e.g., '1d', '1mo', '1y')
+        session: HTTP session to reuse for all requests, keeping connections
+            open across symbols (optional)
+
+    Returns:
+        DataFrame with the data of all extracted symbols
+    """
+    logger.info(f"Extracting Yahoo Finance data for symbols: {symbols}")
+
+    # Download all symbols in a single batched call, yfinance issues the
+    # per-symbol requests concurrently on its own thread pool
+    data = yf.download(
+        tickers=symbols,
+        period=period,
+        group_by='ticker',
+        auto_adjust=True,
+        threads=True,
+        progress=False,
+        session=session
+    )
+
+    # A single ticker comes back without the symbol level in the columns
+    if not isinstance(data.columns, pd.MultiIndex):
+        data = pd.concat({symbols[0]: data}, axis=1)
+
+    # Reshape (symbol, field) columns to one row per date and symbol,
+    # rows of symbols that failed to download are all NaN and get dropped
+    combined_data = data.stack(level=0).rename_axis(['date', 'symbol']).reset_index()
+
+    if combined_data.empty:
         raise ValueError("Failed to extract any data from Yahoo Finance")
 
-    # Combine all data
-    combined_data = pd.concat(all_data, ignore_index=True)
+    missing_symbols = set(symbols) - set(combined_data['symbol'])
+    if missing_symbols:
+        logger.error(f"Error extracting data for {sorted(missing_symbols)}")
+
+    # Rename columns to standardized format (Yahoo Finance columns are already capitalized)
+    combined_data = combined_data.rename(columns={
+        'Open': 'open',
+        'High': 'high',
+        'Low': 'low',
+        'Close': 'close',
+        'Volume': 'volume'
+    })
+
+    # NaN padding of the wide frame turns volume into float, restore integers
+    combined_data['volume'] = combined_data['volume'].fillna(0).astype('int64')
 
     # Add source and timestamp
     combined_data['data_source'] = 'yahoo_finance'
-    combined_data['extracted_at'] = datetime.now().isoformat()
+    combined_data['extracted_at'] = pd.Timestamp.now(tz='UTC')
+    combined_data[CATEGORICAL_COLUMNS] = combined_data[CATEGORICAL_COLUMNS].astype('category')
 
     # Drop unnecessary columns
     columns_to_keep = ['date', 'symbol', 'open', 'high', 'low', 'close', 'volume', 'data_source', 'extracted_at']
-    combined_data = combined_data[columns_to_keep]
+    return combined_data[columns_to_keep]
 
-    # Save to CSV
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    combined_data.to_csv(output_path, index=False)
 
-    logger.info(f"Extracted {len(combined_data)} records to {output_path}")
+def read_extracted_data(input_path: str) -> pd.DataFrame:
+    """
+    Read an extraction output with the extracted column types.
 
-    return output_path
+    Args:
+        input_path: Path to the extracted data file
+
+    Returns:
+        DataFrame with the data of all extracted symbols
+    """
+    logger.info(f"Reading extracted data from {input_path}")
+
+    return read_dataframe(input_path, dtype=STOCK_DATA_DTYPES, parse_dates=EXTRACTED_DATA_DATE_COLUMNS)
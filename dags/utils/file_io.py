@@ -0,0 +1,179 @@
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from typing import Dict, Iterator, List, Optional
+
+from plugins.helpers.columns import CATEGORICAL_COLUMNS
+
+# Buffer size in bytes for writing CSV files
+CSV_WRITE_BUFFER_SIZE = 1 << 20
+
+# Gzip level for compressed CSV files, the fastest level already gives
+# most of the size reduction
+CSV_GZIP_COMPRESSION_LEVEL = 1
+
+# Column types of stock data read back from text files, columnar files
+# already store them. Volume is nullable as not every source reports it
+STOCK_DATA_DTYPES = {
+    'open': 'float64',
+    'high': 'float64',
+    'low': 'float64',
+    'close': 'float64',
+    'volume': 'Int64',
+    **{col: 'category' for col in CATEGORICAL_COLUMNS},
+}
+
+
+def read_dataframe(
+        path: str,
+        dtype: Optional[Dict[str, str]] = None,
+        parse_dates: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Read a data file into a DataFrame, choosing the reader from the file extension.
+
+    CSV files are parsed by the multithreaded pyarrow reader with the given
+    dtypes and date columns in a single pass. Parquet and Feather files
+    already carry their dtypes, columns are only converted where the stored
+    dtype differs.
+
+    Args:
+        path: Path to the data file (.csv, .csv.gz, .parquet or .feather)
+        dtype: Mapping of column name to dtype (optional)
+        parse_dates: List of columns to parse as dates (optional)
+
+    Returns:
+        DataFrame with the file contents
+    """
+    file_ext = _file_extension(path)
+
+    if file_ext in ['.csv', '.csv.gz']:
+        return pd.read_csv(path, dtype=dtype, parse_dates=parse_dates, engine='pyarrow')
+    elif file_ext in ['.parquet', '.pq']:
+        df = pd.read_parquet(path)
+    elif file_ext == '.feather':
+        df = pd.read_feather(path)
+    else:
+        raise ValueError(f"Unsupported file format: {file_ext}")
+
+    return _convert_columns(df, dtype, parse_dates)
+
+
+def iter_dataframe_chunks(
+        path: str,
+        chunksize: int = 100_000,
+        dtype: Optional[Dict[str, str]] = None,
+        parse_dates: Optional[List[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a data file in chunks of rows, choosing the reader from the file extension.
+
+    Each chunk gets the given dtypes and date columns, as read_dataframe does
+    for the whole file.
+
+    Args:
+        path: Path to the data file (.csv, .csv.gz, .parquet or .feather)
+        chunksize: Maximum number of rows per chunk
+        dtype: Mapping of column name to dtype (optional)
+        parse_dates: List of columns to parse as dates (optional)
+
+    Returns:
+        Iterator over DataFrames of at most ``chunksize`` rows
+    """
+    file_ext = _file_extension(path)
+
+    if file_ext in ['.csv', '.csv.gz']:
+        with pd.read_csv(path, chunksize=chunksize, dtype=dtype, parse_dates=parse_dates) as reader:
+            yield from reader
+    elif file_ext in ['.parquet', '.pq']:
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield _convert_columns(batch.to_pandas(), dtype, parse_dates)
+    elif file_ext == '.feather':
+        for batch in feather.read_table(path).to_batches(max_chunksize=chunksize):
+            yield _convert_columns(batch.to_pandas(), dtype, parse_dates)
+    else:
+        raise ValueError(f"Unsupported file format: {file_ext}")
+
+
+def write_dataframe(df: pd.DataFrame, path: str, schema: Optional[pa.Schema] = None) -> str:
+    """
+    Write a DataFrame to a data file, choosing the writer from the file extension.
+
+    Parquet keeps column dtypes, so downstream readers don't have to parse
+    text and rebuild dates and numbers the way they do for CSV.
+
+    Args:
+        df: DataFrame to write
+        path: Path to the data file (.csv, .csv.gz, .parquet or .feather)
+        schema: Arrow schema to select and cast the columns to when writing Parquet (optional)
+
+    Returns:
+        Path to the saved data file
+    """
+    file_ext = _file_extension(path)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    if file_ext == '.csv':
+        # A large write buffer cuts the number of write syscalls
+        with open(path, 'wb', buffering=CSV_WRITE_BUFFER_SIZE) as f:
+            df.to_csv(f, index=False, lineterminator='\n')
+    elif file_ext == '.csv.gz':
+        df.to_csv(
+            path,
+            index=False,
+            lineterminator='\n',
+            compression={'method': 'gzip', 'compresslevel': CSV_GZIP_COMPRESSION_LEVEL}
+        )
+    elif file_ext in ['.parquet', '.pq'] and schema is not None:
+        table = pa.Table.from_pandas(df[schema.names], preserve_index=False)
+        pq.write_table(table.cast(schema), path, compression='snappy')
+    elif file_ext in ['.parquet', '.pq']:
+        df.to_parquet(path, compression='snappy', index=False)
+    elif file_ext == '.feather':
+        # Feather stores the Arrow columns as they are, with light lz4 compression
+        df.to_feather(path, compression='lz4')
+    else:
+        raise ValueError(f"Unsupported file format: {file_ext}")
+
+    return path
+
+
+def _convert_columns(
+        df: pd.DataFrame,
+        dtype: Optional[Dict[str, str]] = None,
+        parse_dates: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Apply dtypes and parse dates of a DataFrame read from a columnar file.
+
+    Args:
+        df: DataFrame as read from the file
+        dtype: Mapping of column name to dtype (optional)
+        parse_dates: List of columns to parse as dates (optional)
+
+    Returns:
+        DataFrame with only the columns whose stored dtype differs converted
+    """
+    for col in parse_dates or []:
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col])
+
+    mismatched = {col: col_type for col, col_type in (dtype or {}).items()
+                  if col in df.columns and df[col].dtype != col_type}
+    if mismatched:
+        df = df.astype(mismatched)
+
+    return df
+
+
+def _file_extension(path: str) -> str:
+    """
+    Get the lowercase extension of a data file, keeping .csv.gz as one extension.
+    """
+    path = path.lower()
+    if path.endswith('.csv.gz'):
+        return '.csv.gz'
+    return os.path.splitext(path)[1]
@@ -1,13 +1,36 @@
+import io
 import os
+import mimetypes
 import logging
 import pandas as pd
-import tempfile
-from typing import Optional, Dict, List, Any, Union
+from typing import Optional, Dict, List, Any, Tuple, Union
 from google.cloud import bigquery, storage
 from google.cloud.exceptions import GoogleCloudError
 
 logger = logging.getLogger(__name__)
 
+# Schema of the stock data table in BigQuery
+STOCK_DATA_BQ_SCHEMA = [
+    bigquery.SchemaField('date', 'DATE', mode='REQUIRED'),
+    bigquery.SchemaField('symbol', 'STRING', mode='REQUIRED'),
+    bigquery.SchemaField('open', 'FLOAT', mode='NULLABLE'),
+    bigquery.SchemaField('high', 'FLOAT', mode='NULLABLE'),
+    bigquery.SchemaField('low', 'FLOAT', mode='NULLABLE'),
+    bigquery.SchemaField('close', 'FLOAT', mode='REQUIRED'),
+    bigquery.SchemaField('volume', 'INTEGER', mode='NULLABLE'),
+    bigquery.SchemaField('data_source', 'STRING', mode='REQUIRED'),
+    bigquery.SchemaField('processed_at', 'TIMESTAMP', mode='REQUIRED'),
+    bigquery.SchemaField('daily_change_pct', 'FLOAT', mode='NULLABLE'),
+    bigquery.SchemaField('daily_volatility', 'FLOAT', mode='NULLABLE'),
+]
+
+# Uploads to GCS go through resumable sessions in chunks of this size, so a
+# transient error only retries the current chunk instead of the whole file
+GCS_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Timeout in seconds for each request of a GCS upload
+GCS_UPLOAD_TIMEOUT = 300
+
 
 def load_to_bigquery(
         data_path: str,
@@ -110,14 +133,18 @@ def upsert_to_bigquery(
         temp_table_id: str,
         key_columns: List[str],
         schema: Optional[List] = None,
-        project_id: Optional[str] = None
+        project_id: Optional[str] = None,
+        partition_field: Optional[str] = None,
+        cluster_fields: Optional[List[str]] = None
 ) -> Dict[str, Any]:
     """
     Perform an upsert (update/insert) operation to BigQuery.
 
     This function first loads data to a temporary table, then
     performs a MERGE operation to update existing records and
-    insert new ones.
+    insert new ones. When the target table is partitioned (and
+    clustered), the MERGE only reads the partitions and clustered
+    values covered by the new data.
 
     Args:
         data_path: Path to the CSV file
@@ -126,6 +153,8 @@ def upsert_to_bigquery(
         key_columns: List of columns to use as the merge key
         schema: BigQuery table schema (optional)
         project_id: GCP project ID (optional, defaults to environment)
+        partition_field: Field the target table is partitioned on (optional)
+        cluster_fields: Fields the target table is clustered on (optional)
 
     Returns:
         Dict with upsert results
@@ -156,11 +185,20 @@ def upsert_to_bigquery(
         # Remove key columns from the list of columns to update
         update_columns = [col for col in columns if col not in key_columns]
 
+        # BigQuery only prunes the target on constant filters, so the range of
+        # the new data is looked up first and passed as query parameters
+        pruning_filters, query_parameters = _merge_pruning_filters(
+            client, temp_table_id, temp_table.schema, partition_field, cluster_fields
+        )
+        on_clause = ' AND '.join(
+            [f'T.{col} = S.{col}' for col in key_columns] + pruning_filters
+        )
+
         # Build MERGE query
         merge_query = f"""
         MERGE `{table_id}` T
         USING `{temp_table_id}` S
-        ON {' AND '.join([f'T.{col} = S.{col}' for col in key_columns])}
+        ON {on_clause}
         WHEN MATCHED THEN
           UPDATE SET {', '.join([f'T.{col} = S.{col}' for col in update_columns])}
         WHEN NOT MATCHED THEN
@@ -169,7 +207,8 @@ def upsert_to_bigquery(
         """
 
         # Execute MERGE query
-        query_job = client.query(merge_query)
+        job_config = bigquery.QueryJobConfig(query_parameters=query_parameters)
+        query_job = client.query(merge_query, job_config=job_config)
         query_result = query_job.result()
 
         # Return results
@@ -190,6 +229,63 @@ def upsert_to_bigquery(
         }
 
 
+def _merge_pruning_filters(
+        client: bigquery.Client,
+        temp_table_id: str,
+        temp_schema: List[bigquery.SchemaField],
+        partition_field: Optional[str] = None,
+        cluster_fields: Optional[List[str]] = None
+) -> Tuple[List[str], List[Any]]:
+    """
+    Build MERGE filters limiting the target table to the new data's partitions.
+
+    Args:
+        client: BigQuery client
+        temp_table_id: BigQuery temporary table ID holding the new data
+        temp_schema: Schema of the temporary table
+        partition_field: Field the target table is partitioned on (optional)
+        cluster_fields: Fields the target table is clustered on (optional)
+
+    Returns:
+        Tuple of (filters on the target table, query parameters they use)
+    """
+    cluster_fields = cluster_fields or []
+    if not partition_field and not cluster_fields:
+        return [], []
+
+    field_types = {field.name: field.field_type for field in temp_schema}
+
+    selects = []
+    if partition_field:
+        selects += [
+            f"MIN({partition_field}) AS min_{partition_field}",
+            f"MAX({partition_field}) AS max_{partition_field}",
+        ]
+    selects += [f"ARRAY_AGG(DISTINCT {col} IGNORE NULLS) AS {col}_values" for col in cluster_fields]
+
+    bounds_query = f"SELECT {', '.join(selects)} FROM `{temp_table_id}`"
+    bounds = next(iter(client.query(bounds_query).result()))
+
+    filters = []
+    query_parameters = []
+    if partition_field:
+        filters.append(
+            f"T.{partition_field} BETWEEN @min_{partition_field} AND @max_{partition_field}"
+        )
+        for bound in ('min', 'max'):
+            name = f"{bound}_{partition_field}"
+            query_parameters.append(
+                bigquery.ScalarQueryParameter(name, field_types[partition_field], bounds[name])
+            )
+    for col in cluster_fields:
+        filters.append(f"T.{col} IN UNNEST(@{col}_values)")
+        query_parameters.append(
+            bigquery.ArrayQueryParameter(f"{col}_values", field_types[col], bounds[f"{col}_values"])
+        )
+
+    return filters, query_parameters
+
+
 def load_dataframe_to_bigquery(
         df: pd.DataFrame,
         table_id: str,
@@ -282,8 +378,8 @@ def load_to_gcs(
         # Get bucket
         bucket = client.bucket(bucket_name)
 
-        # Create blob
-        blob = bucket.blob(blob_name)
+        # Create blob, uploaded in resumable chunks
+        blob = bucket.blob(blob_name, chunk_size=GCS_UPLOAD_CHUNK_SIZE)
 
         # Set content type if provided
         if content_type:
@@ -291,20 +387,30 @@ def load_to_gcs(
 
         # Upload data
         if isinstance(data, pd.DataFrame):
-            # Create a temporary file for the DataFrame
-            with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as temp_file:
-                temp_path = temp_file.name
-                data.to_csv(temp_path, index=False)
-
-            # Upload the file
-            blob.upload_from_filename(temp_path)
-
-            # Clean up
-            os.remove(temp_path)
+            # Serialize the DataFrame to an in-memory buffer and upload it
+            # from there, without a round-trip through a temporary file
+            buffer = io.BytesIO()
+            data.to_csv(buffer, index=False)
+            buffer.seek(0)
+
+            blob.upload_from_file(
+                buffer,
+                rewind=True,
+                content_type=content_type or 'text/csv',
+                checksum='md5',
+                timeout=GCS_UPLOAD_TIMEOUT,
+            )
 
         elif isinstance(data, str) and os.path.isfile(data):
             # Upload from file path
-            blob.upload_from_filename(data)
+            with open(data, 'rb') as file_obj:
+                blob.upload_from_file(
+                    file_obj,
+                    rewind=True,
+                    content_type=content_type or mimetypes.guess_type(data)[0],
+                    checksum='md5',
+                    timeout=GCS_UPLOAD_TIMEOUT,
+                )
 
         else:
             raise ValueError("Data must be either a DataFrame or a path to a file")
@@ -337,7 +443,7 @@ def create_bigquery_table_if_not_exists(
         partition_field: Optional[str] = None,
         cluster_fields: Optional[List[str]] = None,
         description: Optional[str] = None
-):
+) -> Dict[str, Any]:
     """
     Create a BigQuery table if it doesn't exist.
 
@@ -355,4 +461,44 @@ def create_bigquery_table_if_not_exists(
     logger.info(f"Creating BigQuery table {table_id} if it doesn't exist")
 
     # Initialize BigQuery client
-    client = bigquery.Client
+    client = bigquery.Client(project=project_id)
+
+    # Table IDs are given as 'dataset.table', qualify them with the client's project
+    table = bigquery.Table(
+        bigquery.TableReference.from_string(table_id, default_project=client.project),
+        schema=schema,
+    )
+
+    if partition_field:
+        table.time_partitioning = bigquery.TimePartitioning(
+            type_=bigquery.TimePartitioningType.DAY,
+            field=partition_field,
+        )
+
+    if cluster_fields:
+        table.clustering_fields = cluster_fields
+
+    if description:
+        table.description = description
+
+    try:
+        # Leaves an existing table untouched
+        table = client.create_table(table, exists_ok=True)
+
+        # Return results
+        results = {
+            'table_id': table_id,
+            'partition_field': partition_field,
+            'cluster_fields': cluster_fields,
+            'status': 'success'
+        }
+
+        logger.info(f"BigQuery table {table_id} is ready")
+        return results
+
+    except GoogleCloudError as e:
+        logger.error(f"Error creating BigQuery table: {e}")
+        return {
+            'status': 'error',
+            'errors': str(e)
+        }
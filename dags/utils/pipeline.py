@@ -0,0 +1,48 @@
+import logging
+from typing import Any, Optional
+
+from plugins.helpers.validation import handle_validation_results
+from .extractors import read_extracted_data
+from .file_io import write_dataframe
+from .validators import validate_raw_data
+
+logger = logging.getLogger(__name__)
+
+
+def validate_extracted_data(
+        input_path: str,
+        output_path: str,
+        source: str,
+        ti: Optional[Any] = None
+) -> str:
+    """
+    Validate an extraction output and save it where the transform step reads it.
+
+    The data is validated in memory and written once, instead of being
+    saved and read back by a separate validation task.
+
+    Args:
+        input_path: Path to the extracted data file
+        output_path: Path to save the validated data (.csv or .parquet)
+        source: Source of the data ('alpha_vantage' or 'yahoo_finance')
+        ti: Airflow task instance used to record the validation metrics (optional)
+
+    Returns:
+        Path to the saved data file
+
+    Raises:
+        ValueError: If validation fails
+    """
+    extracted_data = read_extracted_data(input_path)
+
+    is_valid, results = validate_raw_data(extracted_data, validation_type=source)
+
+    # Log the results, record the metrics and fail on errors
+    handle_validation_results(is_valid, results, ti=ti, log=logger)
+
+    # Save in the format given by the output path's extension
+    write_dataframe(extracted_data, output_path)
+
+    logger.info(f"Validated {len(extracted_data)} records to {output_path}")
+
+    return output_path
@@ -1,19 +1,48 @@
-import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-from datetime import datetime
-from typing import List
+import pyarrow as pa
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from plugins.helpers.columns import CATEGORICAL_COLUMNS
+from .file_io import STOCK_DATA_DTYPES, iter_dataframe_chunks, read_dataframe, write_dataframe
 
 logger = logging.getLogger(__name__)
 
+# Date columns of the raw extracted data, parsed while reading it
+RAW_DATA_DATE_COLUMNS = ['date']
+
+# Date columns of the transformed data, parsed while merging it
+TRANSFORMED_DATA_DATE_COLUMNS = ['date', 'processed_at']
+
+# Columns identifying a record when merging datasets
+MERGE_KEY_COLUMNS = ['date', 'symbol', 'data_source']
+
+# Columns and types of the merged data as loaded into BigQuery. Parquet
+# carries these types and modes, matching STOCK_DATA_BQ_SCHEMA in loaders.
+MERGED_DATA_SCHEMA = pa.schema([
+    pa.field('date', pa.date32(), nullable=False),
+    pa.field('symbol', pa.string(), nullable=False),
+    pa.field('open', pa.float64()),
+    pa.field('high', pa.float64()),
+    pa.field('low', pa.float64()),
+    pa.field('close', pa.float64(), nullable=False),
+    pa.field('volume', pa.int64()),
+    pa.field('data_source', pa.string(), nullable=False),
+    pa.field('processed_at', pa.timestamp('us', tz='UTC'), nullable=False),
+    pa.field('daily_change_pct', pa.float64()),
+    pa.field('daily_volatility', pa.float64()),
+])
+
 
 def transform_stock_data(input_path: str, output_path: str, source: str) -> str:
     """
     Transform raw stock data into a standardized format.
 
     Args:
-        input_path: Path to the input CSV file
-        output_path: Path to save the transformed data
+        input_path: Path to the input data file (.csv or .parquet)
+        output_path: Path to save the transformed data (.csv or .parquet)
         source: Source of the data ('alpha_vantage' or 'yahoo_finance')
 
     Returns:
@@ -22,91 +51,167 @@ def transform_stock_data(input_path: str, output_path: str, source: str) -> str:
     logger.info(f"Transforming {source} data from {input_path}")
 
     # Read the raw data
-    data = pd.read_csv(input_path)
-
-    # Handle source-specific transformations
-    if source == 'alpha_vantage':
-        # Alpha Vantage specific transformations
-        # Convert date format if needed
-        if 'date' in data.columns and not pd.api.types.is_datetime64_any_dtype(data['date']):
-            data['date'] = pd.to_datetime(data['date'])
-
-    elif source == 'yahoo_finance':
-        # Yahoo Finance specific transformations
-        # Convert date format if needed
-        if 'date' in data.columns and not pd.api.types.is_datetime64_any_dtype(data['date']):
-            data['date'] = pd.to_datetime(data['date'])
-
-    else:
-        raise ValueError(f"Unknown source: {source}")
+    data = read_dataframe(input_path, dtype=STOCK_DATA_DTYPES, parse_dates=RAW_DATA_DATE_COLUMNS)
 
-    # Common transformations
+    data = _transform_stock_frame(data, source)
 
-    # Format date as YYYY-MM-DD
-    data['date'] = data['date'].dt.strftime('%Y-%m-%d')
+    # Save transformed data
+    write_dataframe(data, output_path)
 
-    # Ensure all numeric columns are float
-    for col in ['open', 'high', 'low', 'close']:
-        if col in data.columns:
-            data[col] = data[col].astype(float)
+    logger.info(f"Transformed {len(data)} records to {output_path}")
 
-    # Ensure volume is integer
-    if 'volume' in data.columns:
-        data['volume'] = data['volume'].fillna(0).astype(int)
+    return output_path
 
-    # Add processed timestamp
-    data['processed_at'] = datetime.now().isoformat()
 
-    # Calculate additional metrics
-    # Daily change percentage
-    data['daily_change_pct'] = ((data['close'] - data['open']) / data['open'] * 100).round(2)
+def merge_stock_datasets(input_paths: List[str], output_path: str, chunksize: int = 100_000) -> str:
+    """
+    Merge multiple transformed stock datasets into a single dataset.
 
-    # Daily volatility (high-low range as percentage of open price)
-    data['daily_volatility'] = ((data['high'] - data['low']) / data['open'] * 100).round(2)
+    Input files are read in chunks of rows. Each chunk's records are checked
+    against the merge keys kept so far, so duplicates are dropped as they
+    are read and only unique records are held until the final sort.
 
-    # Sort by date and symbol
-    data = data.sort_values(['symbol', 'date'])
+    Args:
+        input_paths: List of paths to the input data files (.csv or .parquet)
+        output_path: Path to save the merged data (.csv or .parquet)
+        chunksize: Number of rows to read at a time from each input file
 
-    # Save transformed data
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    data.to_csv(output_path, index=False)
+    Returns:
+        Path to the saved merged data file
+    """
+    logger.info(f"Merging datasets: {input_paths}")
 
-    logger.info(f"Transformed {len(data)} records to {output_path}")
+    merged_data = _merge_stock_frames(_iter_data_chunks(input_paths, chunksize))
+
+    # Save merged data
+    write_dataframe(merged_data, output_path, schema=MERGED_DATA_SCHEMA)
+
+    logger.info(f"Merged {len(merged_data)} records to {output_path}")
 
     return output_path
 
 
-def merge_stock_datasets(input_paths: List[str], output_path: str) -> str:
+def transform_and_merge_stock_data(input_paths: Dict[str, str], output_path: str) -> str:
     """
-    Merge multiple transformed stock datasets into a single dataset.
+    Transform raw stock datasets from several sources and merge them in one step.
+
+    The transformed data stays in memory and is written once, instead of
+    saving a transformed file per source and reading them back to merge.
 
     Args:
-        input_paths: List of paths to the input CSV files
-        output_path: Path to save the merged data
+        input_paths: Mapping of data source ('alpha_vantage' or 'yahoo_finance') to its raw data file
+        output_path: Path to save the merged data (.csv or .parquet)
 
     Returns:
         Path to the saved merged data file
     """
-    logger.info(f"Merging datasets: {input_paths}")
+    logger.info(f"Transforming and merging datasets: {input_paths}")
 
-    all_data = []
+    sources = list(input_paths)
 
-    for path in input_paths:
-        try:
-            data = pd.read_csv(path)
-            all_data.append(data)
-        except Exception as e:
-            logger.error(f"Error reading file {path}: {e}")
-            continue
+    # The files are independent and parsing releases the GIL, so read them
+    # in parallel; map keeps the results in the order of the sources
+    with ThreadPoolExecutor(max_workers=max(len(sources), 1)) as executor:
+        raw_data = list(executor.map(_read_raw_data, [input_paths[source] for source in sources]))
+
+    all_data = [
+        _transform_stock_frame(data, source)
+        for source, data in zip(sources, raw_data)
+        if data is not None
+    ]
+
+    merged_data = _merge_stock_frames(all_data)
+
+    # Save merged data
+    write_dataframe(merged_data, output_path, schema=MERGED_DATA_SCHEMA)
+
+    logger.info(f"Transformed and merged {len(merged_data)} records to {output_path}")
+
+    return output_path
+
+
+def _read_raw_data(path: str) -> Optional[pd.DataFrame]:
+    """
+    Read a raw stock data file, returning None if it can't be read.
+
+    Args:
+        path: Path to the raw data file (.csv or .parquet)
+
+    Returns:
+        DataFrame with the raw data, or None on failure
+    """
+    try:
+        return read_dataframe(path, dtype=STOCK_DATA_DTYPES, parse_dates=RAW_DATA_DATE_COLUMNS)
+    except Exception as e:
+        logger.error(f"Error reading file {path}: {e}")
+        return None
+
+
+def _transform_stock_frame(data: pd.DataFrame, source: str) -> pd.DataFrame:
+    """
+    Apply the standard transformations to raw stock data from one source.
 
-    if not all_data:
+    Args:
+        data: DataFrame with raw stock data, read with STOCK_DATA_DTYPES and parsed dates
+        source: Source of the data ('alpha_vantage' or 'yahoo_finance')
+
+    Returns:
+        Transformed DataFrame
+    """
+    if source not in ['alpha_vantage', 'yahoo_finance']:
+        raise ValueError(f"Unknown source: {source}")
+
+    # The date stays datetime64: Parquet stores it natively, the merged file is
+    # cast to a DATE column and CSV writes midnight-only dates as YYYY-MM-DD
+
+    # Missing volume is counted as no trading
+    data['volume'] = data['volume'].fillna(0).astype('int64')
+
+    # Add processed timestamp, broadcast as a single datetime64 column
+    data['processed_at'] = pd.Timestamp.now(tz='UTC')
+
+    # Calculate additional metrics on the underlying arrays, which avoids
+    # building an intermediate Series for every arithmetic step
+    open_price = data['open'].to_numpy()
+    close_price = data['close'].to_numpy()
+    high_price = data['high'].to_numpy()
+    low_price = data['low'].to_numpy()
+
+    # Zero or missing open prices give inf/NaN, as the pandas operations did
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Daily change percentage
+        data['daily_change_pct'] = np.round((close_price - open_price) / open_price * 100.0, 2)
+
+        # Daily volatility (high-low range as percentage of open price)
+        data['daily_volatility'] = np.round((high_price - low_price) / open_price * 100.0, 2)
+
+    # Sort by date and symbol
+    return data.sort_values(['symbol', 'date'])
+
+
+def _merge_stock_frames(all_data: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Merge transformed stock DataFrames, removing duplicate records.
+
+    Args:
+        all_data: Iterable of transformed DataFrames, possibly chunks of files
+
+    Returns:
+        Merged DataFrame sorted by date, symbol and data source
+    """
+    # Remove duplicates based on date, symbol, and data_source as the frames
+    # come in, keeping the first occurrence of each key
+    seen_keys = set()
+    unique_data = [_drop_seen_records(data, seen_keys) for data in all_data]
+
+    if not unique_data:
         raise ValueError("No valid data files to merge")
 
     # Concatenate all datasets
-    merged_data = pd.concat(all_data, ignore_index=True)
+    merged_data = pd.concat(unique_data, ignore_index=True)
 
-    # Remove duplicates based on date, symbol, and data_source
-    merged_data = merged_data.drop_duplicates(subset=['date', 'symbol', 'data_source'])
+    # Frames with different categories concatenate to object, restore them
+    merged_data[CATEGORICAL_COLUMNS] = merged_data[CATEGORICAL_COLUMNS].astype('category')
 
     # If we have the same date and symbol from different sources, we can either:
     # 1. Keep both records (what we're doing now)
@@ -114,15 +219,56 @@ def merge_stock_datasets(input_paths: List[str], output_path: str) -> str:
     # 3. Choose one source as the "source of truth"
 
     # Sort by date and symbol
-    merged_data = merged_data.sort_values(['date', 'symbol', 'data_source'])
+    return merged_data.sort_values(['date', 'symbol', 'data_source'])
 
-    # Save merged data
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    merged_data.to_csv(output_path, index=False)
 
-    logger.info(f"Merged {len(merged_data)} records to {output_path}")
+def _drop_seen_records(data: pd.DataFrame, seen_keys: Set[Tuple]) -> pd.DataFrame:
+    """
+    Drop records whose merge key was already seen and record the new keys.
 
-    return output_path
+    Args:
+        data: Transformed DataFrame, possibly a chunk of a file
+        seen_keys: Merge keys of the records kept so far, updated in place
+
+    Returns:
+        Records of the DataFrame with unseen merge keys, first occurrence kept
+    """
+    # Duplicates within the frame are dropped in one vectorized pass
+    data = data[~data.duplicated(subset=MERGE_KEY_COLUMNS)]
+
+    # Dates are compared as integers, which hash faster than Timestamps
+    key_values = [
+        data[col].to_numpy(dtype='datetime64[ns]').view('int64')
+        if pd.api.types.is_datetime64_any_dtype(data[col]) else data[col].to_numpy()
+        for col in MERGE_KEY_COLUMNS
+    ]
+    keys = list(zip(*(values.tolist() for values in key_values)))
+
+    is_new = np.fromiter((key not in seen_keys for key in keys), dtype=bool, count=len(keys))
+    seen_keys.update(keys)
+
+    return data[is_new]
+
+
+def _iter_data_chunks(input_paths: List[str], chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Read the input data files chunk by chunk, skipping files that can't be read.
+
+    Args:
+        input_paths: List of paths to the input data files (.csv or .parquet)
+        chunksize: Number of rows to read at a time
+
+    Returns:
+        Iterator over DataFrame chunks of all readable files
+    """
+    for path in input_paths:
+        try:
+            yield from iter_dataframe_chunks(
+                path, chunksize=chunksize, dtype=STOCK_DATA_DTYPES, parse_dates=TRANSFORMED_DATA_DATE_COLUMNS
+            )
+        except Exception as e:
+            logger.error(f"Error reading file {path}: {e}")
+            continue
 
 
 def calculate_moving_averages(data: pd.DataFrame, windows: List[int] = [5, 10, 20, 50]) -> pd.DataFrame:
@@ -138,14 +284,13 @@ def calculate_moving_averages(data: pd.DataFrame, windows: List[int] = [5, 10, 2
     """
     result = data.copy()
 
-    # For each symbol, calculate moving averages
-    for symbol in result['symbol'].unique():
-        symbol_data = result[result['symbol'] == symbol].copy()
-
-        for window in windows:
-            ma_col = f'ma_{window}'
-            symbol_data[ma_col] = symbol_data['close'].rolling(window=window).mean().round(2)
+    # Compute each window's rolling mean for all symbols in one grouped pass,
+    # dropping the symbol level so the values align back on the original index.
+    # Only observed categories are grouped, so absent symbols cost nothing
+    grouped_close = result.groupby('symbol', sort=False, observed=True)['close']
 
-        result.loc[result['symbol'] == symbol] = symbol_data
+    for window in windows:
+        ma_col = f'ma_{window}'
+        result[ma_col] = grouped_close.rolling(window=window).mean().round(2).reset_index(level=0, drop=True)
 
     return result
@@ -1,4 +1,5 @@
 import logging
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Any
 import pandera as pa
@@ -6,59 +7,78 @@ import pandera as pa
 logger = logging.getLogger(__name__)
 
 
-# Define schemas for data validation
+# Define schemas for data validation, built once at import and shared by
+# every validation call. symbol and data_source are checked as categoricals,
+# which validates the integer codes instead of coercing every value to a
+# Python string
+
+_RAW_ALPHA_SCHEMA = pa.DataFrameSchema({
+    'date': pa.Column(pa.DateTime, nullable=False, coerce=True),
+    'symbol': pa.Column(pa.Category, nullable=False, coerce=True),
+    'open': pa.Column(pa.Float, nullable=True),
+    'high': pa.Column(pa.Float, nullable=True),
+    'low': pa.Column(pa.Float, nullable=True),
+    'close': pa.Column(pa.Float, nullable=False),
+    'volume': pa.Column(pa.Int, nullable=True),
+    'data_source': pa.Column(pa.Category, nullable=False, coerce=True),
+    'extracted_at': pa.Column(pd.DatetimeTZDtype(tz='UTC'), nullable=False, coerce=True)
+})
+
+_RAW_YAHOO_SCHEMA = pa.DataFrameSchema({
+    'date': pa.Column(pa.DateTime, nullable=False, coerce=True),
+    'symbol': pa.Column(pa.Category, nullable=False, coerce=True),
+    'open': pa.Column(pa.Float, nullable=True),
+    'high': pa.Column(pa.Float, nullable=True),
+    'low': pa.Column(pa.Float, nullable=True),
+    'close': pa.Column(pa.Float, nullable=False),
+    'volume': pa.Column(pa.Int, nullable=True),
+    'data_source': pa.Column(pa.Category, nullable=False, coerce=True),
+    'extracted_at': pa.Column(pd.DatetimeTZDtype(tz='UTC'), nullable=False, coerce=True)
+})
+
+_TRANSFORMED_SCHEMA = pa.DataFrameSchema({
+    'date': pa.Column(pa.Date, nullable=False, coerce=True),
+    'symbol': pa.Column(pa.Category, nullable=False, coerce=True),
+    'open': pa.Column(pa.Float, nullable=True),
+    'high': pa.Column(pa.Float, nullable=True),
+    'low': pa.Column(pa.Float, nullable=True),
+    'close': pa.Column(pa.Float, nullable=False),
+    'volume': pa.Column(pa.Int, nullable=True),
+    'data_source': pa.Column(pa.Category, nullable=False, coerce=True),
+    'processed_at': pa.Column(pd.DatetimeTZDtype(tz='UTC'), nullable=False, coerce=True),
+    'daily_change_pct': pa.Column(pa.Float, nullable=True),
+    'daily_volatility': pa.Column(pa.Float, nullable=True)
+})
+
+# Price, volume and metric columns whose missing values are reported in the metrics
+_TRACKED_COLUMNS = ('open', 'high', 'low', 'close', 'volume', 'daily_change_pct', 'daily_volatility')
+
+# Raw data schemas by validation type
+_SCHEMAS = {
+    'alpha_vantage': _RAW_ALPHA_SCHEMA,
+    'yahoo_finance': _RAW_YAHOO_SCHEMA,
+}
+
 
 def get_raw_alpha_vantage_schema() -> pa.DataFrameSchema:
     """
     Get pandera schema for raw Alpha Vantage data.
     """
-    return pa.DataFrameSchema({
-        'date': pa.Column(pa.String, nullable=False),
-        'symbol': pa.Column(pa.String, nullable=False),
-        'open': pa.Column(pa.Float, nullable=True),
-        'high': pa.Column(pa.Float, nullable=True),
-        'low': pa.Column(pa.Float, nullable=True),
-        'close': pa.Column(pa.Float, nullable=False),
-        'volume': pa.Column(pa.Int, nullable=True),
-        'data_source': pa.Column(pa.String, nullable=False),
-        'extracted_at': pa.Column(pa.String, nullable=False)
-    })
+    return _RAW_ALPHA_SCHEMA
 
 
 def get_raw_yahoo_finance_schema() -> pa.DataFrameSchema:
     """
     Get pandera schema for raw Yahoo Finance data.
     """
-    return pa.DataFrameSchema({
-        'date': pa.Column(pa.String, nullable=False),
-        'symbol': pa.Column(pa.String, nullable=False),
-        'open': pa.Column(pa.Float, nullable=True),
-        'high': pa.Column(pa.Float, nullable=True),
-        'low': pa.Column(pa.Float, nullable=True),
-        'close': pa.Column(pa.Float, nullable=False),
-        'volume': pa.Column(pa.Int, nullable=True),
-        'data_source': pa.Column(pa.String, nullable=False),
-        'extracted_at': pa.Column(pa.String, nullable=False)
-    })
+    return _RAW_YAHOO_SCHEMA
 
 
 def get_transformed_data_schema() -> pa.DataFrameSchema:
     """
     Get pandera schema for transformed data.
     """
-    return pa.DataFrameSchema({
-        'date': pa.Column(pa.String, nullable=False),
-        'symbol': pa.Column(pa.String, nullable=False),
-        'open': pa.Column(pa.Float, nullable=True),
-        'high': pa.Column(pa.Float, nullable=True),
-        'low': pa.Column(pa.Float, nullable=True),
-        'close': pa.Column(pa.Float, nullable=False),
-        'volume': pa.Column(pa.Int, nullable=True),
-        'data_source': pa.Column(pa.String, nullable=False),
-        'processed_at': pa.Column(pa.String, nullable=False),
-        'daily_change_pct': pa.Column(pa.Float, nullable=True),
-        'daily_volatility': pa.Column(pa.Float, nullable=True)
-    })
+    return _TRANSFORMED_SCHEMA
 
 
 def validate_raw_data(df: pd.DataFrame, validation_type: str = None) -> Tuple[bool, Dict[str, Any]]:
@@ -97,60 +117,53 @@ def validate_raw_data(df: pd.DataFrame, validation_type: str = None) -> Tuple[bo
             validation_results['errors'].append(f"Missing required columns: {missing_columns}")
             return False, validation_results
 
-        # Source-specific schema validation
-        if validation_type == 'alpha_vantage':
-            schema = get_raw_alpha_vantage_schema()
-        elif validation_type == 'yahoo_finance':
-            schema = get_raw_yahoo_finance_schema()
-        else:
-            # Use a generic schema if no specific type provided
-            schema = None
+        # Source-specific schema validation, no schema if no specific type provided
+        schema = _SCHEMAS.get(validation_type)
 
         if schema:
             try:
-                schema.validate(df)
-            except pa.errors.SchemaError as e:
+                # Fail fast on the first error instead of collecting every failure case
+                schema.validate(df, lazy=False)
+            except (pa.errors.SchemaError, pa.errors.SchemaErrors) as e:
                 validation_results['passed'] = False
                 validation_results['errors'].append(f"Schema validation failed: {str(e)}")
                 return False, validation_results
 
         # Check for negative prices
-        if (df['close'] < 0).any():
+        if df['close'].min() < 0:
             validation_results['passed'] = False
             validation_results['errors'].append("Found negative close prices")
             return False, validation_results
 
-        # Check for future dates
-        if 'date' in df.columns:
-            if not pd.api.types.is_datetime64_any_dtype(df['date']):
-                df['date_temp'] = pd.to_datetime(df['date'])
-            else:
-                df['date_temp'] = df['date']
-
-            today = pd.Timestamp.now().normalize()
-            future_dates = df[df['date_temp'] > today]
-
-            if not future_dates.empty:
-                validation_results['passed'] = False
-                validation_results['errors'].append(f"Found {len(future_dates)} records with future dates")
-                return False, validation_results
+        # Reference dates and the data's date range, computed once for the
+        # checks and metrics below. Dates are parsed on read and compared
+        # with today's date in UTC
+        dates = _naive_utc_dates(df['date'])
+        oldest_date, newest_date = dates.min(), dates.max()
+        today = pd.Timestamp.now(tz='UTC').normalize().tz_localize(None)
+        one_year_ago = today - pd.Timedelta(days=365)
+
+        # Check for future dates, only counting them when there are any
+        if newest_date > today:
+            future_count = int((dates > today).sum())
+            validation_results['passed'] = False
+            validation_results['errors'].append(f"Found {future_count} records with future dates")
+            return False, validation_results
 
         # Calculate metrics
         validation_results['metrics'] = {
             'record_count': len(df),
             'symbol_count': df['symbol'].nunique(),
-            'date_range': [df['date'].min(), df['date'].max()],
-            'missing_values': df.isnull().sum().to_dict()
+            'date_range': [oldest_date, newest_date],
+            'missing_values': _count_missing_values(df)
         }
 
         # Check for reasonable date range (e.g., not too old)
-        if 'date_temp' in df.columns:
-            oldest_date = pd.to_datetime(df['date'].min())
-            if oldest_date < (pd.Timestamp.now() - pd.Timedelta(days=365)):
-                validation_results['warnings'].append("Data contains records older than one year")
+        if oldest_date < one_year_ago:
+            validation_results['warnings'].append("Data contains records older than one year")
 
         # Check for duplicate records
-        duplicates = df.duplicated(subset=['date', 'symbol']).sum()
+        duplicates = int(df.duplicated(subset=['date', 'symbol']).to_numpy().sum())
         if duplicates > 0:
             validation_results['warnings'].append(f"Found {duplicates} duplicate records")
 
@@ -183,14 +196,15 @@ def validate_transformed_data(df: pd.DataFrame) -> Tuple[bool, Dict[str, Any]]:
         # Schema validation
         schema = get_transformed_data_schema()
         try:
-            schema.validate(df)
-        except pa.errors.SchemaError as e:
+            # Fail fast on the first error instead of collecting every failure case
+            schema.validate(df, lazy=False)
+        except (pa.errors.SchemaError, pa.errors.SchemaErrors) as e:
             validation_results['passed'] = False
             validation_results['errors'].append(f"Schema validation failed: {str(e)}")
             return False, validation_results
 
         # Check for negative prices
-        if (df['close'] < 0).any():
+        if df['close'].min() < 0:
             validation_results['passed'] = False
             validation_results['errors'].append("Found negative close prices")
             return False, validation_results
@@ -207,19 +221,20 @@ def validate_transformed_data(df: pd.DataFrame) -> Tuple[bool, Dict[str, Any]]:
             if max_volume > 1000000000:  # 1 billion shares
                 validation_results['warnings'].append(f"Found unusually high volume: {max_volume}")
 
-        # Check daily volatility is not extremely high
+        # Check daily volatility is not extremely high, counting the records
+        # instead of building a frame of them
         if 'daily_volatility' in df.columns:
-            high_volatility = df[df['daily_volatility'] > 20]  # 20% volatility threshold
-            if not high_volatility.empty:
+            high_volatility_count = int((df['daily_volatility'] > 20).sum())  # 20% volatility threshold
+            if high_volatility_count:
                 validation_results['warnings'].append(
-                    f"Found {len(high_volatility)} records with high volatility (>20%)")
+                    f"Found {high_volatility_count} records with high volatility (>20%)")
 
-        # Calculate metrics
+        # Calculate metrics, each column summarized in a single call
         validation_results['metrics'] = {
             'record_count': len(df),
             'symbol_count': df['symbol'].nunique(),
-            'date_range': [df['date'].min(), df['date'].max()],
-            'missing_values': df.isnull().sum().to_dict(),
+            'date_range': df['date'].agg(['min', 'max']).tolist(),
+            'missing_values': _count_missing_values(df),
             'sources': df['data_source'].value_counts().to_dict()
         }
 
@@ -229,19 +244,28 @@ def validate_transformed_data(df: pd.DataFrame) -> Tuple[bool, Dict[str, Any]]:
             validation_results['warnings'].append(f"Found {duplicates} duplicate records")
 
         # Check for data consistency across sources
-        # Group by date and symbol, check for significant price differences
-        if df['data_source'].nunique() > 1:
-            for symbol in df['symbol'].unique():
-                symbol_data = df[df['symbol'] == symbol]
-                for date in symbol_data['date'].unique():
-                    date_data = symbol_data[symbol_data['date'] == date]
-                    if len(date_data) > 1:  # We have data from multiple sources
-                        close_prices = date_data['close'].values
-                        max_diff_pct = (max(close_prices) - min(close_prices)) / min(close_prices) * 100
-                        if max_diff_pct > 5:  # 5% threshold
-                            validation_results['warnings'].append(
-                                f"Price inconsistency for {symbol} on {date}: {max_diff_pct:.2f}% difference"
-                            )
+        # Label each (symbol, date) group once, then reduce the close prices
+        # and source codes per group with NumPy, check for significant price
+        # differences between sources
+        group_codes = df.groupby(['symbol', 'date'], sort=False, observed=True).ngroup().to_numpy()
+        source_codes = pd.factorize(df['data_source'])[0].astype('float64')
+        n_groups = int(group_codes.max()) + 1 if group_codes.size else 0
+
+        min_close, max_close = _group_min_max(group_codes, df['close'].to_numpy(dtype='float64'), n_groups)
+        min_source, max_source = _group_min_max(group_codes, source_codes, n_groups)
+        max_diff_pct = (max_close - min_close) / min_close * 100
+
+        inconsistent = np.flatnonzero(
+            (min_source != max_source) &  # We have data from multiple sources
+            (max_diff_pct > 5)  # 5% threshold
+        )
+        if inconsistent.size:
+            _, first_rows = np.unique(group_codes, return_index=True)
+            for group, row in zip(inconsistent, first_rows[inconsistent]):
+                symbol, date = df['symbol'].iat[row], df['date'].iat[row]
+                validation_results['warnings'].append(
+                    f"Price inconsistency for {symbol} on {date}: {max_diff_pct[group]:.2f}% difference"
+                )
 
         return validation_results['passed'], validation_results
 
@@ -276,11 +300,8 @@ def validate_data_freshness(df: pd.DataFrame, max_age_days: int = 1) -> Tuple[bo
             validation_results['errors'].append("Date column missing")
             return False, validation_results
 
-        # Convert date to datetime if needed
-        if not pd.api.types.is_datetime64_any_dtype(df['date']):
-            dates = pd.to_datetime(df['date'])
-        else:
-            dates = df['date']
+        # Dates are parsed on read
+        dates = _naive_utc_dates(df['date'])
 
         # Check data freshness
         today = pd.Timestamp.now().normalize()
@@ -407,31 +428,47 @@ def validate_bigquery_schema_compatibility(
             )
             return False, validation_results
 
-        # Check for data type compatibility
-        type_issues = []
+        # Group the schema's field names by BigQuery type once, then check
+        # only the columns that need each kind of type
+        fields_by_type = {}
+        for field in bq_schema:
+            fields_by_type.setdefault(field['type'], set()).add(field['name'])
+
+        float_fields = fields_by_type.get('FLOAT', set()) | fields_by_type.get('FLOAT64', set())
+        integer_fields = fields_by_type.get('INTEGER', set()) | fields_by_type.get('INT64', set())
+        date_fields = fields_by_type.get('DATE', set())
 
-        for col in df.columns:
-            if col in bq_fields:
-                bq_type = bq_fields[col]['type']
-
-                # Check numeric types
-                if bq_type in ['FLOAT', 'FLOAT64'] and not pd.api.types.is_numeric_dtype(df[col]):
-                    type_issues.append(f"{col} should be numeric for BigQuery type {bq_type}")
-
-                # Check integer types
-                elif bq_type in ['INTEGER', 'INT64'] and not (
-                        pd.api.types.is_integer_dtype(df[col]) or
-                        (pd.api.types.is_numeric_dtype(df[col]) and df[col].apply(float.is_integer).all())
-                ):
-                    type_issues.append(f"{col} should be integer for BigQuery type {bq_type}")
-
-                # Check date types
-                elif bq_type == 'DATE' and not (
-                        pd.api.types.is_datetime64_any_dtype(df[col]) or
-                        (pd.api.types.is_string_dtype(df[col]) and
-                         pd.to_datetime(df[col], errors='coerce').notna().all())
-                ):
-                    type_issues.append(f"{col} should be a valid date for BigQuery type {bq_type}")
+        type_issues = []
+        dtypes = df.dtypes.to_dict()
+
+        # Check numeric types
+        type_issues.extend(
+            f"{col} should be numeric for BigQuery type {bq_fields[col]['type']}"
+            for col in df.columns
+            if col in float_fields and not pd.api.types.is_numeric_dtype(dtypes[col])
+        )
+
+        # Check integer types
+        type_issues.extend(
+            f"{col} should be integer for BigQuery type {bq_fields[col]['type']}"
+            for col in df.columns
+            if col in integer_fields and not (
+                    pd.api.types.is_integer_dtype(dtypes[col]) or
+                    (pd.api.types.is_numeric_dtype(dtypes[col]) and _is_whole_number(df[col]))
+            )
+        )
+
+        # Check date types
+        type_issues.extend(
+            f"{col} should be a valid date for BigQuery type DATE"
+            for col in df.columns
+            if col in date_fields and not (
+                    pd.api.types.is_datetime64_any_dtype(dtypes[col]) or
+                    ((pd.api.types.is_string_dtype(dtypes[col]) or
+                      isinstance(dtypes[col], pd.CategoricalDtype)) and
+                     _is_parseable_date(df[col]))
+            )
+        )
 
         if type_issues:
             validation_results['warnings'].extend(type_issues)
@@ -456,3 +493,48 @@ def validate_bigquery_schema_compatibility(
         validation_results['passed'] = False
         validation_results['errors'].append(f"BigQuery schema compatibility validation error: {str(e)}")
         return False, validation_results
+
+
+def _count_missing_values(df: pd.DataFrame) -> Dict[str, int]:
+    """
+    Count missing values in the price, volume and metric columns.
+    """
+    return {col: int(df[col].isna().sum()) for col in _TRACKED_COLUMNS if col in df.columns}
+
+
+def _naive_utc_dates(dates: pd.Series) -> pd.Series:
+    """
+    Convert timezone-aware dates to naive UTC, so they compare with naive reference dates.
+    """
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        return dates.dt.tz_convert(None)
+    return dates
+
+
+def _group_min_max(group_codes: np.ndarray, values: np.ndarray, n_groups: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the minimum and maximum of the values in each group, ignoring NaN.
+    """
+    min_values = np.full(n_groups, np.inf)
+    max_values = np.full(n_groups, -np.inf)
+    np.fmin.at(min_values, group_codes, values)
+    np.fmax.at(max_values, group_codes, values)
+    return min_values, max_values
+
+
+def _is_whole_number(series: pd.Series) -> bool:
+    """
+    Check that every value of a numeric series is a finite whole number.
+    """
+    values = series.to_numpy(dtype='float64', na_value=np.nan)
+    return bool(np.all(np.isfinite(values) & (np.mod(values, 1) == 0)))
+
+
+def _is_parseable_date(series: pd.Series, sample_size: int = 1000) -> bool:
+    """
+    Check that a series holds dates, parsing only a sample of string values.
+    """
+    if pd.api.types.infer_dtype(series, skipna=True) in ('date', 'datetime', 'datetime64'):
+        return True
+
+    return bool(pd.to_datetime(series.iloc[:sample_size], errors='coerce').notna().all())
@@ -1,14 +1,44 @@
+import io
 import logging
 import tempfile
 from typing import Callable, Dict, List, Any, Optional
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pa_pq
 from airflow.models import BaseOperator
 from airflow.utils.decorators import apply_defaults
 from airflow.providers.google.cloud.hooks.gcs import GCSHook
 
 logger = logging.getLogger(__name__)
 
+# Content type of the uploaded object for each supported file format
+MIME_TYPES = {
+    'csv': 'text/csv',
+    'json': 'application/json',
+    'parquet': 'application/octet-stream',
+}
+
+# Column layout of the stock price frames written by the extraction tasks.
+# CSV writes of frames with exactly these columns, and dates without a time
+# of day or time zone, use it directly, so the rows come out in a fixed
+# order with plain dates and string symbols
+STOCK_CSV_SCHEMA = pa.schema([
+    ('date', pa.date32()),
+    ('symbol', pa.string()),
+    ('open', pa.float64()),
+    ('high', pa.float64()),
+    ('low', pa.float64()),
+    ('close', pa.float64()),
+    ('volume', pa.int64()),
+    ('data_source', pa.string()),
+    ('extracted_at', pa.timestamp('us', tz='UTC')),
+])
+
+# Frames larger than this in memory are uploaded from a temporary file
+MAX_IN_MEMORY_UPLOAD_BYTES = 500 * 1024 * 1024
+
 
 class APIToGCSOperator(BaseOperator):
     """
@@ -78,31 +108,40 @@ class APIToGCSOperator(BaseOperator):
         else:
             df = data
 
-        # Save to a temporary file
-        with tempfile.NamedTemporaryFile(
-                prefix=f"airflow_api_data_",
-                suffix=f".{self.file_format}",
-                delete=False
-        ) as temp_file:
-            temp_path = temp_file.name
-
-            # Save in the specified format
-            if self.file_format == 'csv':
-                df.to_csv(temp_path, index=False)
-            elif self.file_format == 'json':
-                df.to_json(temp_path, orient='records', lines=True)
-            elif self.file_format == 'parquet':
-                df.to_parquet(temp_path, index=False)
-            else:
-                raise ValueError(f"Unsupported file format: {self.file_format}")
-
         # Upload to GCS
         hook = GCSHook(gcp_conn_id=self.gcp_conn_id)
-        hook.upload(
-            bucket_name=self.gcs_bucket,
-            object_name=self.gcs_path,
-            filename=temp_path
-        )
+        mime_type = MIME_TYPES.get(self.file_format)
+
+        if mime_type is None:
+            raise ValueError(f"Unsupported file format: {self.file_format}")
+
+        # Shallow estimate, which only reads the column buffer sizes instead of
+        # measuring every string; object columns count as one pointer per value
+        if df.memory_usage(index=False).sum() <= MAX_IN_MEMORY_UPLOAD_BYTES:
+            # Serialize to an in-memory buffer and upload it from there
+            buffer = io.BytesIO()
+            self._write_data(df, buffer)
+
+            hook.upload(
+                bucket_name=self.gcs_bucket,
+                object_name=self.gcs_path,
+                data=buffer.getvalue(),
+                mime_type=mime_type
+            )
+        else:
+            # Very large frames go through a temporary file instead
+            with tempfile.NamedTemporaryFile(
+                    prefix=f"airflow_api_data_",
+                    suffix=f".{self.file_format}"
+            ) as temp_file:
+                self._write_data(df, temp_file.name)
+
+                hook.upload(
+                    bucket_name=self.gcs_bucket,
+                    object_name=self.gcs_path,
+                    filename=temp_file.name,
+                    mime_type=mime_type
+                )
 
         self.log.info(f"Successfully uploaded data to gs://{self.gcs_bucket}/{self.gcs_path}")
 
@@ -116,3 +155,73 @@ class APIToGCSOperator(BaseOperator):
         context['ti'].xcom_push(key='api_to_gcs_metrics', value=metrics)
 
         return metrics
+
+    def _write_data(self, df: pd.DataFrame, target) -> None:
+        """
+        Write the DataFrame in the configured format.
+
+        Args:
+            df: DataFrame to write
+            target: File path or binary buffer to write to
+        """
+        if self.file_format == 'json':
+            df.to_json(target, orient='records', lines=True)
+            return
+
+        if self.file_format == 'csv':
+            pa_csv.write_csv(self._to_csv_table(df), target)
+            return
+
+        # Parquet is written by pyarrow's C++ writer from one Arrow table
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        if self.file_format == 'parquet':
+            pa_pq.write_table(table, target, compression='snappy')
+        else:
+            raise ValueError(f"Unsupported file format: {self.file_format}")
+
+    @staticmethod
+    def _to_csv_table(df: pd.DataFrame) -> pa.Table:
+        """
+        Convert the DataFrame to an Arrow table for pyarrow's CSV writer.
+
+        Frames with the stock price columns are converted with the known
+        schema, skipping type inference, when their dates fit its date type;
+        anything else is inferred, so dates with a time of day or a time
+        zone keep a timestamp type.
+
+        Args:
+            df: DataFrame to convert
+
+        Returns:
+            Arrow table to write
+        """
+        if set(df.columns) == set(STOCK_CSV_SCHEMA.names) and APIToGCSOperator._has_plain_dates(df['date']):
+            try:
+                return pa.Table.from_pandas(
+                    df[STOCK_CSV_SCHEMA.names], schema=STOCK_CSV_SCHEMA, preserve_index=False
+                )
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                logger.debug(f"Frame does not match the stock CSV schema, inferring types: {e}")
+
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    @staticmethod
+    def _has_plain_dates(dates: pd.Series) -> bool:
+        """
+        Check whether the dates can be written as dates without losing anything.
+
+        Casting to a date drops the time of day, and converts time zone aware
+        values to UTC first, which can shift them to another day.
+
+        Args:
+            dates: Date column of the frame
+
+        Returns:
+            True if the dates are time zone naive and all at midnight, or not timestamps
+        """
+        if isinstance(dates.dtype, pd.DatetimeTZDtype):
+            return False
+        if pd.api.types.is_datetime64_dtype(dates):
+            return not (dates.notna() & (dates != dates.dt.normalize())).any()
+        return True
@@ -1,29 +1,46 @@
 import os
 import logging
-from typing import Callable, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
 
 import pandas as pd
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pa_pq
 from airflow.models import BaseOperator
 from airflow.utils.decorators import apply_defaults
 
+from plugins.helpers.columns import CATEGORICAL_COLUMNS
+from plugins.helpers.validation import handle_validation_results
+
 logger = logging.getLogger(__name__)
 
+# Maximum number of validation functions run at the same time
+MAX_VALIDATION_WORKERS = 8
+
+# Columns read for validation functions that only need a few of them
+VALIDATOR_COLUMNS = {
+    'validate_data_freshness': ['date'],
+    'validate_symbol_coverage': ['symbol'],
+}
+
 
 class DataQualityOperator(BaseOperator):
     """
     Operator that runs data quality checks on a dataset.
 
     This operator reads data from a file, runs a validation function on it,
-    and raises an exception if the validation fails.
+    and raises an exception if the validation fails. Given a list of
+    validation functions, it runs them concurrently on the same data.
     """
 
     @apply_defaults
     def __init__(
             self,
             data_path: str,
-            validation_callable: Callable,
+            validation_callable: Union[Callable, List[Callable]],
             validation_type: Optional[str] = None,
-            validation_kwargs: Optional[Dict[str, Any]] = None,
+            validation_kwargs: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
+            columns: Optional[List[str]] = None,
             *args, **kwargs
     ):
         """
@@ -31,15 +48,29 @@ class DataQualityOperator(BaseOperator):
 
         Args:
             data_path: Path to the data file to validate
-            validation_callable: Function to call for validation
-            validation_type: Type of validation to perform (passed to validation_callable)
-            validation_kwargs: Additional keyword arguments to pass to validation_callable
+            validation_callable: Function to call for validation, or a list of functions
+            validation_type: Type of validation to perform (passed to a single validation_callable)
+            validation_kwargs: Additional keyword arguments to pass to validation_callable,
+                a list with one dict per function when validation_callable is a list
+            columns: Columns to read from the data file, all columns if not set (optional)
+
+        Raises:
+            ValueError: If a list of validation_kwargs doesn't match the validation functions
         """
         super().__init__(*args, **kwargs)
+
+        # A list of kwargs pairs up with a list of validators, which zip() in
+        # _run_validations would silently truncate to the shorter one
+        if isinstance(validation_kwargs, list) and (
+                not isinstance(validation_callable, list) or len(validation_kwargs) != len(validation_callable)
+        ):
+            raise ValueError("validation_kwargs must have one dict per function of validation_callable")
+
         self.data_path = data_path
         self.validation_callable = validation_callable
         self.validation_type = validation_type
         self.validation_kwargs = validation_kwargs or {}
+        self.columns = columns
 
     def execute(self, context):
         """
@@ -62,37 +93,110 @@ class DataQualityOperator(BaseOperator):
         # Read the data file based on file extension
         file_ext = os.path.splitext(self.data_path)[1].lower()
 
+        # CSV and Parquet are read by pyarrow, which only reads the requested columns
+        columns = self._columns_to_read()
+
         if file_ext == '.csv':
-            df = pd.read_csv(self.data_path)
+            df = pa_csv.read_csv(
+                self.data_path,
+                read_options=pa_csv.ReadOptions(use_threads=True),
+                convert_options=pa_csv.ConvertOptions(include_columns=columns),
+            ).to_pandas()
         elif file_ext in ['.parquet', '.pq']:
-            df = pd.read_parquet(self.data_path)
+            df = pa_pq.read_table(self.data_path, columns=columns, memory_map=True).to_pandas()
         elif file_ext == '.json':
             df = pd.read_json(self.data_path)
+            if columns:
+                df = df[columns]
         else:
             raise ValueError(f"Unsupported file format: {file_ext}")
 
-        # Run validation
-        kwargs = {**self.validation_kwargs}
-        if self.validation_type:
-            kwargs['validation_type'] = self.validation_type
-
-        is_valid, results = self.validation_callable(df, **kwargs)
+        # Parse dates once here so the validators can compare them directly,
+        # a fixed format skips pandas' format inference. Malformed dates raise
+        # instead of becoming NaT, which the validators would not report
+        if 'date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['date']):
+            df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d', cache=True, errors='raise')
 
-        # Log validation results
-        self.log.info(f"Validation results: {results}")
+        # Low-cardinality string columns as categoricals, so unique, grouping
+        # and comparisons in the validators work on integer codes
+        for col in CATEGORICAL_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
 
-        # Record metrics in task instance XCom
-        context['ti'].xcom_push(key='validation_metrics', value=results.get('metrics', {}))
+        # Run validation
+        if isinstance(self.validation_callable, list):
+            is_valid, results = self._run_validations(df)
+        else:
+            kwargs = {**self.validation_kwargs}
+            if self.validation_type:
+                kwargs['validation_type'] = self.validation_type
 
-        # Handle warnings
-        for warning in results.get('warnings', []):
-            self.log.warning(f"Validation warning: {warning}")
+            is_valid, results = self.validation_callable(df, **kwargs)
 
-        # If validation failed, raise an exception
-        if not is_valid:
-            error_message = "\n".join(results.get('errors', ['Validation failed']))
-            raise ValueError(f"Data quality validation failed: {error_message}")
+        # Log the results, record the metrics and fail on errors
+        handle_validation_results(is_valid, results, ti=context['ti'], log=self.log)
 
         self.log.info("Data quality validation passed")
 
         return results
+
+    def _columns_to_read(self) -> Optional[List[str]]:
+        """
+        Get the columns to read from the data file.
+
+        Returns:
+            The configured columns, else the columns needed by the validators
+            when all of them are known to need only a few, else None for all
+        """
+        if self.columns:
+            return self.columns
+
+        callables = self.validation_callable
+        if not isinstance(callables, list):
+            callables = [callables]
+
+        # Partials and callable objects have no name to look up, read all columns for them
+        needed_columns = [VALIDATOR_COLUMNS.get(getattr(callable_, '__name__', None)) for callable_ in callables]
+        if any(columns is None for columns in needed_columns):
+            return None
+
+        return sorted({col for columns in needed_columns for col in columns})
+
+    def _run_validations(self, df: pd.DataFrame) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Run several validation functions concurrently and combine their results.
+
+        The validators don't modify the DataFrame and spend most of their time
+        in pandas and NumPy kernels that release the GIL, so threads overlap.
+
+        Args:
+            df: DataFrame to validate
+
+        Returns:
+            Tuple of (is_valid, validation_results), with errors and warnings
+            prefixed by validator name and metrics keyed by validator name
+        """
+        callables = self.validation_callable
+        if isinstance(self.validation_kwargs, list):
+            kwargs_list = self.validation_kwargs
+        else:
+            kwargs_list = [self.validation_kwargs] * len(callables)
+
+        with ThreadPoolExecutor(max_workers=min(MAX_VALIDATION_WORKERS, len(callables))) as executor:
+            futures = [executor.submit(callable_, df, **kwargs) for callable_, kwargs in zip(callables, kwargs_list)]
+            outcomes = [future.result() for future in futures]
+
+        results = {
+            'passed': all(is_valid for is_valid, _ in outcomes),
+            'errors': [],
+            'warnings': [],
+            'metrics': {}
+        }
+
+        for index, (callable_, (_, validator_results)) in enumerate(zip(callables, outcomes)):
+            name = getattr(callable_, '__name__', None) or f"validator_{index}"
+            results['errors'].extend(f"{name}: {error}" for error in validator_results.get('errors', []))
+            results['warnings'].extend(f"{name}: {warning}" for warning in validator_results.get('warnings', []))
+            results['metrics'][name] = validator_results.get('metrics', {})
+
+        return results['passed'], results
@@ -0,0 +1,2 @@
+# Low-cardinality string columns, stored as categoricals
+CATEGORICAL_COLUMNS = ['symbol', 'data_source']
@@ -72,7 +72,9 @@ ORDER BY price_diff_pct DESC
 ;
 """
 
-# Query to get rolling averages for stock prices
+# Query to get rolling averages for stock prices. One running sum per symbol
+# gives every moving average as the difference with its value N rows back,
+# so all windows share a single ordered scan instead of one frame each
 ROLLING_AVERAGES_QUERY = """
 WITH daily_prices AS (
   SELECT
@@ -83,66 +85,85 @@ WITH daily_prices AS (
   WHERE symbol IN UNNEST({symbols})
     AND date >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY)
   GROUP BY date, symbol
+),
+
+running_totals AS (
+  SELECT
+    date,
+    symbol,
+    close_price,
+    SUM(close_price) OVER by_symbol AS running_sum,
+    ROW_NUMBER() OVER by_symbol AS row_num
+  FROM daily_prices
+  WINDOW by_symbol AS (PARTITION BY symbol ORDER BY date)
 )
 
 SELECT
   date,
   symbol,
   close_price,
-  AVG(close_price) OVER (
-    PARTITION BY symbol
-    ORDER BY date
-    ROWS BETWEEN 4 PRECEDING AND CURRENT ROW
-  ) AS ma_5d,
-  AVG(close_price) OVER (
-    PARTITION BY symbol
-    ORDER BY date
-    ROWS BETWEEN 9 PRECEDING AND CURRENT ROW
-  ) AS ma_10d,
-  AVG(close_price) OVER (
-    PARTITION BY symbol
-    ORDER BY date
-    ROWS BETWEEN 19 PRECEDING AND CURRENT ROW
-  ) AS ma_20d,
-  AVG(close_price) OVER (
-    PARTITION BY symbol
-    ORDER BY date
-    ROWS BETWEEN 49 PRECEDING AND CURRENT ROW
-  ) AS ma_50d
-FROM daily_prices
+  (running_sum - IFNULL(LAG(running_sum, 5) OVER by_symbol, 0)) / LEAST(row_num, 5) AS ma_5d,
+  (running_sum - IFNULL(LAG(running_sum, 10) OVER by_symbol, 0)) / LEAST(row_num, 10) AS ma_10d,
+  (running_sum - IFNULL(LAG(running_sum, 20) OVER by_symbol, 0)) / LEAST(row_num, 20) AS ma_20d,
+  (running_sum - IFNULL(LAG(running_sum, 50) OVER by_symbol, 0)) / LEAST(row_num, 50) AS ma_50d
+FROM running_totals
+WINDOW by_symbol AS (PARTITION BY symbol ORDER BY date)
 ORDER BY symbol, date
 ;
 """
 
-# Query to get data quality metrics
+# Query to get data quality metrics, a single row over the last 30 days
 DATA_QUALITY_METRICS_QUERY = """
+WITH recent_data AS (
+  SELECT *
+  FROM `{project}.{dataset}.{table}`
+  WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL 30 DAY)
+    AND date <= CURRENT_DATE()
+),
+
+record_stats AS (
+  SELECT
+    -- Record counts
+    COUNT(*) AS total_records,
+    COUNT(DISTINCT date) AS unique_dates,
+    COUNT(DISTINCT symbol) AS unique_symbols,
+    COUNT(DISTINCT data_source) AS unique_sources,
+
+    -- Date range
+    MIN(date) AS oldest_date,
+    MAX(date) AS newest_date,
+
+    -- Missing values
+    COUNTIF(open IS NULL) AS null_open_count,
+    COUNTIF(high IS NULL) AS null_high_count,
+    COUNTIF(low IS NULL) AS null_low_count,
+    COUNTIF(volume IS NULL) AS null_volume_count,
+
+    -- Price statistics
+    MIN(close) AS min_close_price,
+    MAX(close) AS max_close_price,
+    AVG(close) AS avg_close_price
+  FROM recent_data
+),
+
+-- Source distribution
+source_distribution AS (
+  SELECT
+    ARRAY_AGG(STRUCT(data_source, count) ORDER BY data_source) AS source_distribution
+  FROM (
+    SELECT
+      data_source,
+      COUNT(*) AS count
+    FROM recent_data
+    GROUP BY data_source
+  )
+)
+
 SELECT
-  -- Record counts
-  COUNT(*) AS total_records,
-  COUNT(DISTINCT date) AS unique_dates,
-  COUNT(DISTINCT symbol) AS unique_symbols,
-  COUNT(DISTINCT data_source) AS unique_sources,
-
-  -- Date range
-  MIN(date) AS oldest_date,
-  MAX(date) AS newest_date,
-
-  -- Missing values
-  COUNTIF(open IS NULL) AS null_open_count,
-  COUNTIF(high IS NULL) AS null_high_count,
-  COUNTIF(low IS NULL) AS null_low_count,
-  COUNTIF(volume IS NULL) AS null_volume_count,
-
-  -- Price statistics
-  MIN(close) AS min_close_price,
-  MAX(close) AS max_close_price,
-  AVG(close) AS avg_close_price,
-
-  -- Source distribution
-  ARRAY_AGG(STRUCT(data_source, COUNT(*) AS count) ORDER BY data_source) AS source_distribution
-FROM `{project}.{dataset}.{table}`
-WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL 30 DAY)
-GROUP BY ROLLUP(())
+  record_stats.*,
+  source_distribution.source_distribution
+FROM record_stats
+CROSS JOIN source_distribution
 ;
 """
 
@@ -157,7 +178,18 @@ SELECT
   MAX(date) AS newest_data_date
 FROM `{project}.{dataset}.{table}`
 WHERE DATE(processed_at) >= DATE_SUB(CURRENT_DATE(), INTERVAL 14 DAY)
+  AND date <= CURRENT_DATE()
 GROUP BY ingestion_date
 ORDER BY ingestion_date DESC
 ;
-"""
\ No newline at end of file
+"""
+
+# Query to count records with future dates after loading, the date filter
+# prunes the table down to the partitions after today
+FUTURE_DATE_CHECK_QUERY = """
+SELECT
+  COUNT(*) AS future_count
+FROM `{project}.{dataset}.{table}`
+WHERE date > CURRENT_DATE()
+;
+"""
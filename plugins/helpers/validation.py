@@ -0,0 +1,41 @@
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def handle_validation_results(
+        is_valid: bool,
+        results: Dict[str, Any],
+        ti: Optional[Any] = None,
+        log: Optional[logging.Logger] = None
+) -> None:
+    """
+    Log validation results, record their metrics and fail if validation failed.
+
+    Args:
+        is_valid: Whether the validation passed
+        results: Validation results with errors, warnings and metrics
+        ti: Airflow task instance used to record the validation metrics (optional)
+        log: Logger to report to (optional, defaults to this module's logger)
+
+    Raises:
+        ValueError: If validation failed
+    """
+    log = log or logger
+
+    # Log validation results
+    log.info(f"Validation results: {results}")
+
+    # Record metrics in task instance XCom
+    if ti is not None:
+        ti.xcom_push(key='validation_metrics', value=results.get('metrics', {}))
+
+    # Handle warnings
+    for warning in results.get('warnings', []):
+        log.warning(f"Validation warning: {warning}")
+
+    # If validation failed, raise an exception
+    if not is_valid:
+        error_message = "\n".join(results.get('errors', ['Validation failed']))
+        raise ValueError(f"Data quality validation failed: {error_message}")
@@ -0,0 +1,68 @@
+import io
+import unittest
+import pandas as pd
+
+try:
+    from plugins.custom_operators.api_gcs import APIToGCSOperator
+except ImportError:
+    # The operator needs Airflow, which is not installed everywhere the tests run
+    APIToGCSOperator = None
+
+
+@unittest.skipIf(APIToGCSOperator is None, "Airflow is not installed")
+class TestAPIToGCSOperator(unittest.TestCase):
+    """Test cases for the API to GCS operator."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by all tests, the tests don't modify them."""
+        # Sample extracted stock data, with the stock CSV schema columns
+        cls.data = pd.DataFrame({
+            'date': pd.to_datetime(['2023-09-01', '2023-09-05']),
+            'symbol': pd.Categorical(['AAPL', 'MSFT']),
+            'open': [180.31, 330.0],
+            'high': [182.05, 331.5],
+            'low': [179.22, 329.0],
+            'close': [181.15, 331.0],
+            'volume': [52123400, 21010000],
+            'data_source': 'yahoo_finance',
+            'extracted_at': pd.Timestamp('2023-09-08 06:00', tz='UTC'),
+        })
+
+    def _write_csv(self, df: pd.DataFrame) -> str:
+        """Serialize the DataFrame as the operator does for CSV uploads."""
+        operator = APIToGCSOperator(
+            task_id='api_to_gcs',
+            fetch_callable=lambda: df,
+            gcs_bucket='bucket',
+            gcs_path='stock_data/data.csv',
+        )
+        buffer = io.BytesIO()
+        operator._write_data(df, buffer)
+        return buffer.getvalue().decode()
+
+    def test_write_csv_plain_dates(self):
+        """Test the CSV written for midnight dates, with the stock CSV schema."""
+        self.assertEqual(
+            self._write_csv(self.data),
+            '"date","symbol","open","high","low","close","volume","data_source","extracted_at"\n'
+            '2023-09-01,"AAPL",180.31,182.05,179.22,181.15,52123400,"yahoo_finance",2023-09-08 06:00:00.000000Z\n'
+            '2023-09-05,"MSFT",330,331.5,329,331,21010000,"yahoo_finance",2023-09-08 06:00:00.000000Z\n'
+        )
+
+    def test_write_csv_timestamps(self):
+        """Test that dates with a time of day are written as timestamps, not truncated."""
+        data = self.data.assign(date=pd.to_datetime(['2023-09-01 15:30', '2023-09-05 00:00']))
+
+        self.assertEqual(
+            self._write_csv(data),
+            '"date","symbol","open","high","low","close","volume","data_source","extracted_at"\n'
+            '2023-09-01 15:30:00.000000000,"AAPL",180.31,182.05,179.22,181.15,52123400,"yahoo_finance",'
+            '2023-09-08 06:00:00Z\n'
+            '2023-09-05 00:00:00.000000000,"MSFT",330,331.5,329,331,21010000,"yahoo_finance",'
+            '2023-09-08 06:00:00Z\n'
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import functools
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+import pandas as pd
+
+from dags.utils.file_io import write_dataframe
+from dags.utils.validators import validate_data_freshness, validate_symbol_coverage
+
+try:
+    from plugins.custom_operators.data_quality import DataQualityOperator
+except ImportError:
+    # The operator needs Airflow, which is not installed everywhere the tests run
+    DataQualityOperator = None
+
+
+class _FreshnessCheck:
+    """Callable object validator, it has no __name__ like a function does."""
+
+    def __call__(self, df: pd.DataFrame):
+        return validate_data_freshness(df, max_age_days=30)
+
+
+@unittest.skipIf(DataQualityOperator is None, "Airflow is not installed")
+class TestDataQualityOperator(unittest.TestCase):
+    """Test cases for the data quality operator."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by all tests, the tests don't modify them."""
+        # Recent dates for two symbols, so the data passes the freshness check
+        dates = pd.bdate_range(end=pd.Timestamp.now().normalize() - pd.Timedelta(days=1), periods=3)
+
+        cls.data = pd.DataFrame({
+            'date': list(dates) * 2,
+            'symbol': ['AAPL'] * 3 + ['MSFT'] * 3,
+            'close': [181.15, 182.92, 183.40, 330.10, 331.50, 329.80],
+            'data_source': 'yahoo_finance',
+        })
+
+    def setUp(self):
+        """Set up test fixtures."""
+        # Create a temp directory for data files, unique to each test
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.temp_dir = self._temp_dir.name
+        self.data_path = write_dataframe(self.data, os.path.join(self.temp_dir, "data.parquet"))
+
+    def tearDown(self):
+        """Clean up after tests."""
+        # Remove the temp directory and any test files
+        self._temp_dir.cleanup()
+
+    def _execute(self, operator):
+        """Run the operator and return its results and the mocked task instance."""
+        ti = Mock()
+        return operator.execute({'ti': ti}), ti
+
+    def _write_csv(self, data: pd.DataFrame) -> str:
+        """Write the data as CSV with plain dates, as the transform step does."""
+        path = os.path.join(self.temp_dir, "data.csv")
+        data.to_csv(path, index=False, date_format='%Y-%m-%d')
+        return path
+
+    def test_csv_dates_are_parsed(self):
+        """Test that CSV dates are parsed before the validators compare them."""
+        operator = DataQualityOperator(
+            task_id='validate_data',
+            data_path=self._write_csv(self.data),
+            validation_callable=validate_data_freshness,
+            validation_kwargs={'max_age_days': 30},
+        )
+
+        results, _ = self._execute(operator)
+        self.assertTrue(results['passed'])
+
+    def test_malformed_csv_dates_raise(self):
+        """Test that malformed dates fail the task instead of becoming NaT."""
+        data = self.data.astype({'date': str})
+        data.loc[1, 'date'] = '2023-13-45'
+
+        operator = DataQualityOperator(
+            task_id='validate_data',
+            data_path=self._write_csv(data),
+            validation_callable=validate_data_freshness,
+            validation_kwargs={'max_age_days': 30},
+        )
+
+        with self.assertRaises(ValueError):
+            self._execute(operator)
+
+    def test_validation_callable_list(self):
+        """Test running several validators and combining their results."""
+        operator = DataQualityOperator(
+            task_id='validate_data',
+            data_path=self.data_path,
+            validation_callable=[validate_data_freshness, validate_symbol_coverage],
+            validation_kwargs=[{'max_age_days': 30}, {'required_symbols': ['AAPL', 'MSFT', 'TSLA']}],
+        )
+
+        # Only the columns the registered validators need are read
+        self.assertEqual(operator._columns_to_read(), ['date', 'symbol'])
+
+        # A missing symbol fails the coverage check, errors are prefixed by validator
+        with self.assertRaises(ValueError) as error:
+            self._execute(operator)
+        self.assertIn("validate_symbol_coverage: ", str(error.exception))
+
+    def test_validation_kwargs_mismatch(self):
+        """Test that a list of validation kwargs must match the validators one to one."""
+        cases = {
+            'fewer kwargs': ([validate_data_freshness, validate_symbol_coverage], [{'max_age_days': 30}]),
+            'more kwargs': ([validate_data_freshness, validate_symbol_coverage], [{}, {}, {}]),
+            'single validator': (validate_data_freshness, [{'max_age_days': 30}]),
+        }
+
+        for case, (validation_callable, validation_kwargs) in cases.items():
+            with self.subTest(case=case):
+                with self.assertRaises(ValueError):
+                    DataQualityOperator(
+                        task_id='validate_data',
+                        data_path=self.data_path,
+                        validation_callable=validation_callable,
+                        validation_kwargs=validation_kwargs,
+                    )
+
+    def test_validation_callable_list_pushes_metrics(self):
+        """Test that passing validators push their metrics keyed by name."""
+        operator = DataQualityOperator(
+            task_id='validate_data',
+            data_path=self.data_path,
+            validation_callable=[validate_data_freshness, validate_symbol_coverage],
+            validation_kwargs=[{'max_age_days': 30}, {'required_symbols': ['AAPL', 'MSFT']}],
+        )
+
+        results, ti = self._execute(operator)
+
+        self.assertTrue(results['passed'])
+        self.assertEqual(set(results['metrics']), {'validate_data_freshness', 'validate_symbol_coverage'})
+        self.assertEqual(ti.xcom_push.call_count, 1)
+
+    def test_unnamed_validation_callables(self):
+        """Test that partials and callable objects are accepted and read all columns."""
+        validators = {
+            'partial': functools.partial(validate_data_freshness, max_age_days=30),
+            'callable object': _FreshnessCheck(),
+        }
+
+        for kind, validator in validators.items():
+            with self.subTest(kind=kind):
+                operator = DataQualityOperator(
+                    task_id='validate_data',
+                    data_path=self.data_path,
+                    validation_callable=validator,
+                )
+
+                self.assertIsNone(operator._columns_to_read())
+
+                results, _ = self._execute(operator)
+                self.assertTrue(results['passed'])
+
+    def test_unnamed_validation_callables_in_list(self):
+        """Test that unnamed validators in a list get positional names."""
+        operator = DataQualityOperator(
+            task_id='validate_data',
+            data_path=self.data_path,
+            validation_callable=[
+                functools.partial(validate_data_freshness, max_age_days=30),
+                validate_symbol_coverage,
+            ],
+            validation_kwargs=[{}, {'required_symbols': ['AAPL', 'MSFT']}],
+        )
+
+        results, _ = self._execute(operator)
+
+        self.assertTrue(results['passed'])
+        self.assertEqual(set(results['metrics']), {'validator_0', 'validate_symbol_coverage'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,73 +1,130 @@
+import asyncio
 import os
+import tempfile
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, Mock
 import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import requests
+from alpha_vantage.async_support.timeseries import TimeSeries
 
-from dags.utils.extractors import extract_alpha_vantage_data, extract_yahoo_finance_data
+from dags.utils.extractors import (
+    extract_alpha_vantage_data,
+    extract_yahoo_finance_data,
+    fetch_alpha_vantage_data,
+    fetch_yahoo_finance_data,
+    read_extracted_data,
+)
 
 
 class TestExtractors(unittest.TestCase):
     """Test cases for data extraction utilities."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        # Create a temp directory for output files
-        self.temp_dir = "/tmp/extractor_tests/"
-        os.makedirs(self.temp_dir, exist_ok=True)
-
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by all tests, the tests don't modify them."""
         # Sample stock symbols
-        self.symbols = ['AAPL', 'MSFT']
+        cls.symbols = ['AAPL', 'MSFT']
 
         # Sample Alpha Vantage data
-        self.alpha_vantage_data = pd.DataFrame({
-            'date': ['2023-09-01', '2023-09-02'],
-            '1. open': [180.31, 181.22],
-            '2. high': [182.05, 183.55],
-            '3. low': [179.22, 180.13],
-            '4. close': [181.15, 182.92],
-            '5. volume': [52123400, 48726500]
+        cls.alpha_vantage_data = pd.DataFrame({
+            'date': ['2023-09-01'],
+            '1. open': [180.31],
+            '2. high': [182.05],
+            '3. low': [179.22],
+            '4. close': [181.15],
+            '5. volume': [52123400]
         })
-        self.alpha_vantage_data.set_index('date', inplace=True)
+        cls.alpha_vantage_data.set_index('date', inplace=True)
 
         # Sample Yahoo Finance data
-        self.yahoo_finance_data = pd.DataFrame({
-            'Date': [pd.Timestamp('2023-09-01'), pd.Timestamp('2023-09-02')],
-            'Open': [180.31, 181.22],
-            'High': [182.05, 183.55],
-            'Low': [179.22, 180.13],
-            'Close': [181.15, 182.92],
-            'Volume': [52123400, 48726500],
-            'Dividends': [0, 0],
-            'Stock Splits': [0, 0]
+        cls.yahoo_finance_data = pd.DataFrame({
+            'Date': pd.to_datetime(['2023-09-01']),
+            'Open': [180.31],
+            'High': [182.05],
+            'Low': [179.22],
+            'Close': [181.15],
+            'Volume': [52123400]
         })
 
+        # The same data in the (symbol, field) column layout of yf.download,
+        # the tests check extracted columns and values so one row per symbol is enough
+        cls.yahoo_finance_history = cls.yahoo_finance_data.set_index('Date')
+
+        # Extract from both mocked APIs once, the tests assert on the shared
+        # results and on the recorded calls
+        with patch('dags.utils.extractors.TimeSeries') as mock_time_series, \
+                patch('dags.utils.extractors.yf.download') as mock_download:
+            # Mock the async TimeSeries class, its coroutine methods become AsyncMocks
+            cls.mock_ts_instance = Mock(spec=TimeSeries)
+            mock_time_series.return_value = cls.mock_ts_instance
+            cls.mock_ts_instance.get_daily.return_value = (cls.alpha_vantage_data, {
+                "1. Information": "Daily Prices",
+                "2. Symbol": "AAPL",
+                "3. Last Refreshed": "2023-09-02",
+                "4. Output Size": "Compact",
+                "5. Time Zone": "US/Eastern"
+            })
+            mock_download.return_value = pd.concat(
+                {symbol: cls.yahoo_finance_history for symbol in cls.symbols}, axis=1
+            )
+
+            cls.alpha_vantage_output = fetch_alpha_vantage_data(symbols=cls.symbols, api_key="dummy_key")
+            cls.yahoo_finance_output = fetch_yahoo_finance_data(symbols=cls.symbols, period="1mo")
+
+        cls.mock_time_series = mock_time_series
+        cls.mock_download = mock_download
+
+    def setUp(self):
+        """Set up test fixtures."""
+        # Create a temp directory for output files, unique to each test
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.temp_dir = self._temp_dir.name
+
     def tearDown(self):
         """Clean up after tests."""
-        # Remove any test files
-        for file in os.listdir(self.temp_dir):
-            os.remove(os.path.join(self.temp_dir, file))
-        os.rmdir(self.temp_dir)
+        # Remove the temp directory and any test files
+        self._temp_dir.cleanup()
 
-    @patch('dags.utils.extractors.TimeSeries')
-    def test_extract_alpha_vantage_data(self, mock_time_series):
+    def test_fetch_alpha_vantage_data(self):
         """Test extraction from Alpha Vantage API."""
-        # Mock the TimeSeries class
-        mock_ts_instance = MagicMock()
-        mock_time_series.return_value = mock_ts_instance
+        # Check that one client served every symbol's request
+        self.assertEqual(self.mock_time_series.call_count, 1)
+        self.assertEqual(self.mock_ts_instance.get_daily.await_count, len(self.symbols))
+        self.assertEqual(
+            {call.kwargs['symbol'] for call in self.mock_ts_instance.get_daily.call_args_list},
+            set(self.symbols)
+        )
+        self.assertEqual(self.mock_ts_instance.close.await_count, 1)
 
-        # Configure the mock to return our sample data
-        mock_ts_instance.get_daily.return_value = (self.alpha_vantage_data, {
-            "1. Information": "Daily Prices",
-            "2. Symbol": "AAPL",
-            "3. Last Refreshed": "2023-09-02",
-            "4. Output Size": "Compact",
-            "5. Time Zone": "US/Eastern"
-        })
+    def test_fetched_data(self):
+        """Test the symbols and source of the data extracted from each API."""
+        outputs = {
+            'alpha_vantage': self.alpha_vantage_output,
+            'yahoo_finance': self.yahoo_finance_output,
+        }
+
+        for source, output_data in outputs.items():
+            with self.subTest(source=source):
+                pd.testing.assert_frame_equal(
+                    output_data[['symbol', 'data_source']].iloc[:1].reset_index(drop=True),
+                    pd.DataFrame({'symbol': ['AAPL'], 'data_source': [source]}),
+                    check_dtype=False,
+                    check_categorical=False
+                )
+
+    @patch('dags.utils.extractors.TimeSeries')
+    def test_extract_alpha_vantage_data_to_csv(self, mock_time_series):
+        """Test that extracted data is saved to a CSV file."""
+        mock_ts_instance = Mock(spec=TimeSeries)
+        mock_time_series.return_value = mock_ts_instance
+        mock_ts_instance.get_daily.return_value = (self.alpha_vantage_data, {})
 
         # Test the function
         output_path = os.path.join(self.temp_dir, "alpha_vantage_test.csv")
         result = extract_alpha_vantage_data(
-            symbols=self.symbols,
+            symbols=self.symbols[:1],
             output_path=output_path,
             api_key="dummy_key"
         )
@@ -76,45 +133,151 @@ class TestExtractors(unittest.TestCase):
         self.assertEqual(result, output_path)
         self.assertTrue(os.path.exists(output_path))
 
-        # Check that the function was called with correct parameters
-        mock_ts_instance.get_daily.assert_called()
+        # The index is not written, the header starts with the first column
+        with open(output_path) as f:
+            header = f.readline().rstrip('\n').split(',')
+        self.assertEqual(header[0], 'date')
+        self.assertNotIn('', header)
 
-        # Read the output file and check its contents
-        output_data = pd.read_csv(output_path)
-        self.assertIn('symbol', output_data.columns)
-        self.assertIn('data_source', output_data.columns)
-        self.assertEqual(output_data['data_source'].unique()[0], 'alpha_vantage')
+        # Read the output file with pyarrow and check its contents
+        output_data = pa_csv.read_csv(output_path)
+        self.assertEqual(output_data.num_rows, len(self.alpha_vantage_data))
+        self.assertIn('symbol', output_data.column_names)
+        self.assertEqual(pc.unique(output_data['data_source']).to_pylist(), ['alpha_vantage'])
 
-    @patch('dags.utils.extractors.yf.Ticker')
-    def test_extract_yahoo_finance_data(self, mock_ticker):
-        """Test extraction from Yahoo Finance API."""
-        # Mock the Ticker class
-        mock_ticker_instance = MagicMock()
-        mock_ticker.return_value = mock_ticker_instance
+    @patch('dags.utils.extractors.TimeSeries')
+    def test_extract_alpha_vantage_data_to_gzipped_csv(self, mock_time_series):
+        """Test that extracted data is saved to a gzip-compressed CSV file."""
+        mock_ts_instance = Mock(spec=TimeSeries)
+        mock_time_series.return_value = mock_ts_instance
+        mock_ts_instance.get_daily.return_value = (self.alpha_vantage_data, {})
+
+        # Test the function
+        output_path = os.path.join(self.temp_dir, "alpha_vantage_test.csv.gz")
+        extract_alpha_vantage_data(
+            symbols=self.symbols[:1],
+            output_path=output_path,
+            api_key="dummy_key"
+        )
 
-        # Configure the mock to return our sample data
-        mock_ticker_instance.history.return_value = self.yahoo_finance_data
+        # The gzip header flags the fastest compression level
+        with open(output_path, 'rb') as f:
+            header = f.read(10)
+        self.assertEqual(header[:2], b'\x1f\x8b')
+        self.assertEqual(header[8], 4)
+
+        # Read the output file and check its contents
+        output_data = pd.read_csv(output_path, compression='gzip')
+        self.assertEqual(len(output_data), len(self.alpha_vantage_data))
+        self.assertEqual(output_data['data_source'].iat[0], 'alpha_vantage')
+
+    @patch('dags.utils.extractors.yf.download')
+    def test_extract_yahoo_finance_data_to_feather(self, mock_download):
+        """Test that extracted data is saved to a Feather file."""
+        history = self.yahoo_finance_history
+        mock_download.return_value = pd.concat({self.symbols[0]: history}, axis=1)
 
         # Test the function
-        output_path = os.path.join(self.temp_dir, "yahoo_finance_test.csv")
+        output_path = os.path.join(self.temp_dir, "yahoo_finance_test.feather")
         result = extract_yahoo_finance_data(
-            symbols=self.symbols,
+            symbols=self.symbols[:1],
             output_path=output_path,
             period="1mo"
         )
 
         # Assertions
         self.assertEqual(result, output_path)
-        self.assertTrue(os.path.exists(output_path))
 
+        # Read the output file and check its contents, dtypes survive the round-trip
+        output_data = pd.read_feather(output_path)
+        self.assertEqual(len(output_data), len(history))
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(output_data['date']))
+        self.assertEqual(output_data['data_source'].iat[0], 'yahoo_finance')
+
+    def test_fetch_yahoo_finance_data(self):
+        """Test extraction from Yahoo Finance API."""
         # Check that the function was called with correct parameters
-        mock_ticker_instance.history.assert_called_with(period="1mo")
+        self.assertEqual(self.mock_download.call_count, 1)
+        self.assertEqual(self.mock_download.call_args.kwargs['tickers'], self.symbols)
+        self.assertEqual(self.mock_download.call_args.kwargs['period'], "1mo")
+        self.assertTrue(self.mock_download.call_args.kwargs['threads'])
 
-        # Read the output file and check its contents
-        output_data = pd.read_csv(output_path)
-        self.assertIn('symbol', output_data.columns)
-        self.assertIn('data_source', output_data.columns)
-        self.assertEqual(output_data['data_source'].unique()[0], 'yahoo_finance')
+    @patch('dags.utils.extractors.yf.download')
+    def test_fetch_yahoo_finance_data_batches_symbols(self, mock_download):
+        """Test that many symbols are fetched with a single batched download."""
+        symbols = [f"SYM{i}" for i in range(20)]
+        history = self.yahoo_finance_history
+        mock_download.return_value = pd.concat({symbol: history for symbol in symbols}, axis=1)
+
+        # Test the function
+        output_data = fetch_yahoo_finance_data(symbols=symbols, period="1mo")
+
+        # One request for all symbols, and every symbol in the result
+        self.assertEqual(mock_download.call_count, 1)
+        self.assertEqual(mock_download.call_args.kwargs['tickers'], symbols)
+        self.assertEqual(set(output_data['symbol']), set(symbols))
+
+    @patch('dags.utils.extractors.yf.download')
+    def test_fetch_yahoo_finance_data_reuses_session(self, mock_download):
+        """Test that a given HTTP session is used for all symbols' requests."""
+        history = self.yahoo_finance_history
+        mock_download.return_value = pd.concat({symbol: history for symbol in self.symbols}, axis=1)
+        mock_session = Mock(spec=requests.Session)
+
+        # Test the function
+        fetch_yahoo_finance_data(symbols=self.symbols, period="1mo", session=mock_session)
+
+        # The session is handed to the single download and left open
+        self.assertEqual(mock_download.call_count, 1)
+        self.assertIs(mock_download.call_args.kwargs['session'], mock_session)
+        self.assertEqual(mock_session.close.call_count, 0)
+
+    @patch('dags.utils.extractors.TimeSeries')
+    def test_fetch_alpha_vantage_data_runs_requests_concurrently(self, mock_time_series):
+        """Test that per-symbol requests are in flight at the same time."""
+        mock_ts_instance = Mock(spec=TimeSeries)
+        mock_time_series.return_value = mock_ts_instance
+
+        # Track how many requests are waiting on the API at once
+        in_flight = {'current': 0, 'max': 0}
+
+        async def get_daily(symbol, outputsize):
+            in_flight['current'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['current'])
+            await asyncio.sleep(0)
+            in_flight['current'] -= 1
+            return self.alpha_vantage_data, {}
+
+        mock_ts_instance.get_daily.side_effect = get_daily
+
+        # Test the function
+        output_data = fetch_alpha_vantage_data(symbols=self.symbols, api_key="dummy_key")
+
+        # All symbols were requested together, within the rate limit
+        self.assertEqual(in_flight['max'], len(self.symbols))
+        self.assertEqual(set(output_data['symbol']), set(self.symbols))
+
+    @patch('dags.utils.extractors.yf.download')
+    def test_read_extracted_data(self, mock_download):
+        """Test reading an extraction output back with its column types."""
+        history = self.yahoo_finance_history
+        mock_download.return_value = pd.concat({symbol: history for symbol in self.symbols}, axis=1)
+
+        for extension in ['.csv', '.parquet']:
+            with self.subTest(extension=extension):
+                input_path = extract_yahoo_finance_data(
+                    symbols=self.symbols,
+                    output_path=os.path.join(self.temp_dir, f"extracted{extension}")
+                )
+
+                # Test the function
+                extracted_data = read_extracted_data(input_path)
+
+                # Assertions
+                self.assertEqual(len(extracted_data), len(self.symbols) * len(history))
+                self.assertEqual(set(extracted_data['symbol']), set(self.symbols))
+                self.assertIsInstance(extracted_data['symbol'].dtype, pd.CategoricalDtype)
+                self.assertTrue(pd.api.types.is_datetime64_any_dtype(extracted_data['date']))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dags.utils.file_io import iter_dataframe_chunks, read_dataframe, write_dataframe
+
+
+class TestFileIO(unittest.TestCase):
+    """Test cases for data file reading and writing."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by all tests, the tests don't modify them."""
+        cls.data = pd.DataFrame({
+            'date': pd.to_datetime(['2023-09-01', '2023-09-05', '2023-09-06']),
+            'symbol': ['AAPL', 'AAPL', 'MSFT'],
+            'close': [181.15, 182.92, 330.10],
+            'volume': [52123400, 48726500, 21010000],
+        })
+
+        cls.extensions = ['.csv', '.csv.gz', '.parquet', '.pq', '.feather']
+
+    def setUp(self):
+        """Set up test fixtures."""
+        # Create a temp directory for output files, unique to each test
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.temp_dir = self._temp_dir.name
+
+    def tearDown(self):
+        """Clean up after tests."""
+        # Remove the temp directory and any test files
+        self._temp_dir.cleanup()
+
+    def test_write_and_read_round_trip(self):
+        """Test that each format reads back the written data."""
+        for extension in self.extensions:
+            with self.subTest(extension=extension):
+                path = os.path.join(self.temp_dir, "nested", f"data{extension}")
+
+                # The parent directory is created on write
+                self.assertEqual(write_dataframe(self.data, path), path)
+
+                output_data = read_dataframe(path, parse_dates=['date'])
+                pd.testing.assert_frame_equal(output_data, self.data)
+
+    def test_read_dataframe_dtypes(self):
+        """Test that requested dtypes are applied whatever the format."""
+        for extension in self.extensions:
+            with self.subTest(extension=extension):
+                path = write_dataframe(self.data, os.path.join(self.temp_dir, f"data{extension}"))
+
+                output_data = read_dataframe(path, dtype={'symbol': 'category', 'volume': 'float64'})
+                self.assertIsInstance(output_data['symbol'].dtype, pd.CategoricalDtype)
+                self.assertEqual(output_data['volume'].dtype, 'float64')
+
+    def test_write_parquet_with_schema(self):
+        """Test that a schema selects and casts the written columns."""
+        schema = pa.schema([('symbol', pa.string()), ('close', pa.float32())])
+        path = write_dataframe(self.data, os.path.join(self.temp_dir, "data.parquet"), schema=schema)
+
+        self.assertEqual(pq.read_schema(path).remove_metadata(), schema)
+
+    def test_iter_dataframe_chunks(self):
+        """Test that chunked reads cover every row in order."""
+        for extension in self.extensions:
+            with self.subTest(extension=extension):
+                path = write_dataframe(self.data, os.path.join(self.temp_dir, f"data{extension}"))
+
+                chunks = list(iter_dataframe_chunks(path, chunksize=2))
+                self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+                self.assertEqual(pd.concat(chunks)['close'].tolist(), self.data['close'].tolist())
+
+    def test_iter_dataframe_chunks_dtypes(self):
+        """Test that each chunk gets the requested dtypes and parsed dates."""
+        for extension in self.extensions:
+            with self.subTest(extension=extension):
+                path = write_dataframe(self.data, os.path.join(self.temp_dir, f"data{extension}"))
+
+                for chunk in iter_dataframe_chunks(
+                        path, chunksize=2, dtype={'symbol': 'category', 'volume': 'Int64'}, parse_dates=['date']
+                ):
+                    self.assertIsInstance(chunk['symbol'].dtype, pd.CategoricalDtype)
+                    self.assertEqual(chunk['volume'].dtype, 'Int64')
+                    self.assertTrue(pd.api.types.is_datetime64_any_dtype(chunk['date']))
+
+    def test_unsupported_format(self):
+        """Test that unknown extensions are rejected."""
+        path = os.path.join(self.temp_dir, "data.xlsx")
+
+        with self.assertRaises(ValueError):
+            write_dataframe(self.data, path)
+        with self.assertRaises(ValueError):
+            read_dataframe(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
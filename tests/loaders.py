@@ -0,0 +1,121 @@
+import unittest
+from datetime import date
+from unittest import mock
+
+from google.api_core.exceptions import Forbidden
+from google.cloud import bigquery
+
+from dags.utils.loaders import STOCK_DATA_BQ_SCHEMA, create_bigquery_table_if_not_exists, upsert_to_bigquery
+
+
+class TestLoaders(unittest.TestCase):
+    """Test cases for BigQuery loaders, the BigQuery client is mocked."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.client = mock.Mock(project='project')
+        self.client.get_table.return_value.schema = [
+            bigquery.SchemaField('date', 'DATE'),
+            bigquery.SchemaField('symbol', 'STRING'),
+            bigquery.SchemaField('close', 'FLOAT'),
+        ]
+
+        client_patcher = mock.patch('dags.utils.loaders.bigquery.Client', return_value=self.client)
+        client_patcher.start()
+        self.addCleanup(client_patcher.stop)
+
+        load_patcher = mock.patch('dags.utils.loaders.load_to_bigquery', return_value={'status': 'success'})
+        self.load_to_bigquery = load_patcher.start()
+        self.addCleanup(load_patcher.stop)
+
+    def test_upsert_prunes_target_on_new_data(self):
+        """Test that the MERGE filters the target on the new data's range."""
+        bounds = {
+            'min_date': date(2023, 9, 1),
+            'max_date': date(2023, 9, 6),
+            'symbol_values': ['AAPL', 'MSFT'],
+        }
+        bounds_job = mock.Mock()
+        bounds_job.result.return_value = iter([bounds])
+        merge_job = mock.Mock(job_id='job', num_dml_affected_rows=3)
+        self.client.query.side_effect = [bounds_job, merge_job]
+
+        result = upsert_to_bigquery(
+            "data.parquet", "stocks.daily", "stocks.daily_temp", ['date', 'symbol'],
+            partition_field='date', cluster_fields=['symbol']
+        )
+
+        self.assertEqual(result, {'job_id': 'job', 'rows_affected': 3, 'status': 'success'})
+
+        merge_query = self.client.query.call_args_list[1].args[0]
+        self.assertIn(
+            "ON T.date = S.date AND T.symbol = S.symbol"
+            " AND T.date BETWEEN @min_date AND @max_date"
+            " AND T.symbol IN UNNEST(@symbol_values)",
+            merge_query
+        )
+        self.assertIn("UPDATE SET T.close = S.close", merge_query)
+
+        min_date, max_date, symbols = self.client.query.call_args_list[1].kwargs['job_config'].query_parameters
+        self.assertEqual((min_date.name, min_date.type_, min_date.value), ('min_date', 'DATE', date(2023, 9, 1)))
+        self.assertEqual((max_date.name, max_date.type_, max_date.value), ('max_date', 'DATE', date(2023, 9, 6)))
+        self.assertEqual((symbols.name, symbols.array_type, symbols.values), ('symbol_values', 'STRING', ['AAPL', 'MSFT']))
+
+    def test_upsert_without_partitioning(self):
+        """Test that an unpartitioned target is merged on the key columns only."""
+        self.client.query.return_value = mock.Mock(job_id='job', num_dml_affected_rows=1)
+
+        upsert_to_bigquery("data.parquet", "stocks.daily", "stocks.daily_temp", ['date', 'symbol'])
+
+        # No bounds query is needed
+        self.client.query.assert_called_once()
+        merge_query = self.client.query.call_args.args[0]
+        self.assertIn("ON T.date = S.date AND T.symbol = S.symbol\n", merge_query)
+
+    def test_upsert_temp_load_failure(self):
+        """Test that a failed temporary load is returned without merging."""
+        self.load_to_bigquery.return_value = {'status': 'error', 'errors': 'boom'}
+
+        result = upsert_to_bigquery("data.parquet", "stocks.daily", "stocks.daily_temp", ['date'])
+
+        self.assertEqual(result['status'], 'error')
+        self.client.query.assert_not_called()
+
+    def test_create_table_partitioned_and_clustered(self):
+        """Test that the table is created partitioned by day and clustered."""
+        self.client.create_table.side_effect = lambda table, exists_ok: table
+
+        result = create_bigquery_table_if_not_exists(
+            'stocks.daily', STOCK_DATA_BQ_SCHEMA, partition_field='date', cluster_fields=['symbol']
+        )
+
+        self.assertEqual(result, {
+            'table_id': 'stocks.daily',
+            'partition_field': 'date',
+            'cluster_fields': ['symbol'],
+            'status': 'success',
+        })
+
+        # An existing table is left as is
+        table = self.client.create_table.call_args.args[0]
+        self.assertEqual(self.client.create_table.call_args.kwargs, {'exists_ok': True})
+
+        # The dataset.table ID is qualified with the client's project
+        self.assertEqual(table.reference.path, '/projects/project/datasets/stocks/tables/daily')
+        self.assertEqual(table.schema, STOCK_DATA_BQ_SCHEMA)
+        self.assertEqual(table.time_partitioning.type_, bigquery.TimePartitioningType.DAY)
+        self.assertEqual(table.time_partitioning.field, 'date')
+        self.assertEqual(table.clustering_fields, ['symbol'])
+
+    def test_create_table_error(self):
+        """Test that BigQuery errors are returned as an error status."""
+        self.client.create_table.side_effect = Forbidden('denied')
+
+        result = create_bigquery_table_if_not_exists('stocks.daily', STOCK_DATA_BQ_SCHEMA)
+
+        self.assertEqual(result['status'], 'error')
+        self.assertIn('denied', result['errors'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+import pandas as pd
+
+from dags.utils.file_io import STOCK_DATA_DTYPES, read_dataframe, write_dataframe
+from dags.utils.pipeline import validate_extracted_data
+
+
+class TestPipeline(unittest.TestCase):
+    """Test cases for combined pipeline steps."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by all tests, the tests don't modify them."""
+        # Recent business days, so the data passes the freshness checks
+        dates = pd.bdate_range(end=pd.Timestamp.now().normalize() - pd.Timedelta(days=1), periods=3)
+
+        # Sample extracted data of one symbol per source, as written by the extractors
+        cls.extracted_data = {
+            source: pd.DataFrame({
+                'date': dates,
+                'open': [180.31, 181.22, 182.10],
+                'high': [182.05, 183.55, 184.00],
+                'low': [179.22, 180.13, 181.50],
+                'close': [181.15, 182.92, 183.40],
+                'volume': [52123400, 48726500, 50111200],
+                'symbol': pd.Categorical([symbol] * 3),
+                'data_source': pd.Categorical([source] * 3),
+                'extracted_at': pd.Timestamp.now(tz='UTC'),
+            })
+            for source, symbol in [('alpha_vantage', 'AAPL'), ('yahoo_finance', 'MSFT')]
+        }
+
+    def setUp(self):
+        """Set up test fixtures."""
+        # Create a temp directory for output files, unique to each test
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.temp_dir = self._temp_dir.name
+
+    def tearDown(self):
+        """Clean up after tests."""
+        # Remove the temp directory and any test files
+        self._temp_dir.cleanup()
+
+    def _validate(self, extension: str, source: str) -> pd.DataFrame:
+        """Write a source's extract in the given format, validate it and read the result."""
+        input_path = write_dataframe(
+            self.extracted_data[source], os.path.join(self.temp_dir, f"{source}{extension}")
+        )
+        output_path = os.path.join(self.temp_dir, f"{source}_validated{extension}")
+
+        result = validate_extracted_data(input_path, output_path, source)
+
+        self.assertEqual(result, output_path)
+        return read_dataframe(output_path, parse_dates=['date'])
+
+    def test_validate_csv_extracts(self):
+        """Test that CSV extracts are parsed back to dates before validation."""
+        for extension in ['.csv', '.csv.gz']:
+            for source in self.extracted_data:
+                with self.subTest(extension=extension, source=source):
+                    validated_data = self._validate(extension, source)
+                    self.assertEqual(len(validated_data), len(self.extracted_data[source]))
+                    self.assertEqual(validated_data['data_source'].iat[0], source)
+
+    def test_validate_columnar_extracts(self):
+        """Test validating Parquet and Feather extracts."""
+        for extension in ['.parquet', '.feather']:
+            for source in self.extracted_data:
+                with self.subTest(extension=extension, source=source):
+                    validated_data = self._validate(extension, source)
+
+                    # The extract is read back with the stock data column types
+                    expected = self.extracted_data[source].astype(STOCK_DATA_DTYPES)
+                    pd.testing.assert_frame_equal(validated_data, expected, check_categorical=False)
+
+    def test_validate_rejects_invalid_data(self):
+        """Test that invalid extracts raise an error and are not saved."""
+        invalid_data = self.extracted_data['yahoo_finance'].assign(close=-1.0)
+        input_path = write_dataframe(invalid_data, os.path.join(self.temp_dir, "invalid.parquet"))
+        output_path = os.path.join(self.temp_dir, "validated.parquet")
+
+        with self.assertRaises(ValueError):
+            validate_extracted_data(input_path, output_path, 'yahoo_finance')
+        self.assertFalse(os.path.exists(output_path))
+
+    def test_validate_pushes_metrics(self):
+        """Test that the validation metrics are recorded on the task instance."""
+        input_path = write_dataframe(
+            self.extracted_data['alpha_vantage'], os.path.join(self.temp_dir, "extracted.parquet")
+        )
+        ti = Mock()
+
+        validate_extracted_data(input_path, os.path.join(self.temp_dir, "validated.parquet"), 'alpha_vantage', ti=ti)
+
+        ti.xcom_push.assert_called_once()
+        self.assertEqual(ti.xcom_push.call_args.kwargs['key'], 'validation_metrics')
+        self.assertEqual(ti.xcom_push.call_args.kwargs['value']['record_count'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
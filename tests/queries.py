@@ -0,0 +1,64 @@
+import re
+import unittest
+
+from plugins.helpers.queries import DATA_QUALITY_METRICS_QUERY, FUTURE_DATE_CHECK_QUERY, ROLLING_AVERAGES_QUERY
+
+
+class TestQueries(unittest.TestCase):
+    """Test cases for rendering the BigQuery queries."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by all tests, the tests don't modify them."""
+        cls.table_params = {'project': 'project', 'dataset': 'stocks', 'table': 'daily'}
+
+    def _cte_names(self, query: str) -> list:
+        """Get the names of the common table expressions of a query, in order."""
+        return re.findall(r'^(?:WITH )?(\w+) AS \($', query, flags=re.MULTILINE)
+
+    def test_rolling_averages_query(self):
+        """Test that all moving averages are derived from one running sum."""
+        query = ROLLING_AVERAGES_QUERY.format(symbols=['AAPL', 'MSFT'], **self.table_params)
+
+        self.assertIn("FROM `project.stocks.daily`", query)
+        self.assertIn("WHERE symbol IN UNNEST(['AAPL', 'MSFT'])", query)
+        self.assertEqual(self._cte_names(query), ['daily_prices', 'running_totals'])
+
+        # A single windowed sum, each average subtracts its lagged value
+        self.assertEqual(query.count("SUM(close_price) OVER"), 1)
+        for window in [5, 10, 20, 50]:
+            with self.subTest(window=window):
+                self.assertIn(
+                    f"(running_sum - IFNULL(LAG(running_sum, {window}) OVER by_symbol, 0))"
+                    f" / LEAST(row_num, {window}) AS ma_{window}d",
+                    query
+                )
+
+    def test_data_quality_metrics_query(self):
+        """Test that the metrics are plain aggregates over the recent data, without ROLLUP."""
+        query = DATA_QUALITY_METRICS_QUERY.format(**self.table_params)
+
+        self.assertEqual(self._cte_names(query), ['recent_data', 'record_stats', 'source_distribution'])
+        self.assertNotIn("ROLLUP", query)
+        self.assertNotIn("GROUP BY", query.split("source_distribution AS (")[0])
+
+        # The table is read once, bounded to the last 30 days up to today
+        self.assertEqual(query.count("FROM `project.stocks.daily`"), 1)
+        self.assertIn("WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL 30 DAY)", query)
+        self.assertIn("AND date <= CURRENT_DATE()", query)
+
+        for column in ['total_records', 'unique_symbols', 'oldest_date', 'newest_date',
+                       'null_volume_count', 'avg_close_price', 'source_distribution']:
+            with self.subTest(column=column):
+                self.assertIn(f"AS {column}", query)
+
+    def test_future_date_check_query(self):
+        """Test that future dates are counted with a filter on the partition column."""
+        query = FUTURE_DATE_CHECK_QUERY.format(**self.table_params)
+
+        self.assertIn("COUNT(*) AS future_count", query)
+        self.assertIn("FROM `project.stocks.daily`\nWHERE date > CURRENT_DATE()", query)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dags.utils.file_io import read_dataframe, write_dataframe
+from dags.utils.loaders import STOCK_DATA_BQ_SCHEMA
+from dags.utils.transformers import (
+    _merge_stock_frames,
+    calculate_moving_averages,
+    merge_stock_datasets,
+    transform_and_merge_stock_data,
+)
+
+# Arrow type written for each BigQuery column type of the stock data table
+BQ_ARROW_TYPES = {
+    'DATE': pa.date32(),
+    'STRING': pa.string(),
+    'FLOAT': pa.float64(),
+    'INTEGER': pa.int64(),
+    'TIMESTAMP': pa.timestamp('us', tz='UTC'),
+}
+
+
+class TestTransformers(unittest.TestCase):
+    """Test cases for data transformation utilities."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by all tests, the tests don't modify them."""
+        dates = pd.date_range('2023-09-01', periods=4, freq='B')
+
+        # Sample transformed data of one symbol from each source
+        cls.transformed_data = pd.DataFrame({
+            'date': list(dates) * 2,
+            'symbol': ['AAPL'] * 8,
+            'open': [180.0, 181.0, 182.0, 183.0, 180.5, 181.5, 182.5, 183.5],
+            'high': [182.0, 183.0, 184.0, 185.0, 182.5, 183.5, 184.5, 185.5],
+            'low': [179.0, 180.0, 181.0, 182.0, 179.5, 180.5, 181.5, 182.5],
+            'close': [181.0, 182.0, 183.0, 184.0, 181.5, 182.5, 183.5, 184.5],
+            'volume': [100, 200, 300, 400, 150, 250, 350, 450],
+            'data_source': ['alpha_vantage'] * 4 + ['yahoo_finance'] * 4,
+            'daily_change_pct': 0.5,
+            'daily_volatility': 1.5,
+            'processed_at': pd.Timestamp('2023-09-08', tz='UTC'),
+        })
+
+        # Common resolution of the date columns, to compare data read back from files
+        cls.timestamp_dtypes = {'date': 'datetime64[ns]', 'processed_at': 'datetime64[ns, UTC]'}
+
+    def setUp(self):
+        """Set up test fixtures."""
+        # Create a temp directory for output files, unique to each test
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.temp_dir = self._temp_dir.name
+
+    def tearDown(self):
+        """Clean up after tests."""
+        # Remove the temp directory and any test files
+        self._temp_dir.cleanup()
+
+    def test_merge_stock_frames_across_chunks(self):
+        """Test merging in-memory chunks with repeated keys."""
+        chunks = [
+            self.transformed_data.iloc[:3],
+            self.transformed_data.iloc[3:6],
+            # Repeats of earlier keys with other prices, and the remaining rows
+            self.transformed_data.iloc[[0, 4]].assign(close=999.0),
+            self.transformed_data.iloc[6:],
+        ]
+        # Each chunk has its own categories, as when read from separate files
+        chunks = [chunk.astype({'symbol': 'category', 'data_source': 'category'}) for chunk in chunks]
+
+        # Test the function
+        merged_data = _merge_stock_frames(chunks)
+
+        # The first occurrence of each key is kept, sorted by the merge keys
+        expected = self.transformed_data.sort_values(['date', 'symbol', 'data_source'])
+        expected = expected.astype({'symbol': 'category', 'data_source': 'category'})
+        pd.testing.assert_frame_equal(merged_data.reset_index(drop=True), expected.reset_index(drop=True))
+
+    def test_merge_stock_frames_without_data(self):
+        """Test that merging nothing raises an error."""
+        with self.assertRaises(ValueError):
+            _merge_stock_frames(iter([]))
+
+    def test_merge_stock_datasets_drops_duplicates_across_chunks(self):
+        """Test that records repeated in later chunks and files are dropped."""
+        # The first file repeats its first record in its last chunk, the second
+        # file overlaps two of its Alpha Vantage dates, both with other prices
+        first = pd.concat(
+            [self.transformed_data, self.transformed_data.iloc[[0]].assign(close=999.0)],
+            ignore_index=True
+        )
+        second = self.transformed_data.iloc[2:4].assign(close=999.0)
+
+        for extension in ['.csv', '.parquet']:
+            with self.subTest(extension=extension):
+                input_paths = [
+                    write_dataframe(first, os.path.join(self.temp_dir, f"first{extension}")),
+                    write_dataframe(second, os.path.join(self.temp_dir, f"second{extension}")),
+                ]
+                output_path = os.path.join(self.temp_dir, "merged.parquet")
+
+                # Test the function, with chunks smaller than the files
+                merge_stock_datasets(input_paths, output_path, chunksize=3)
+
+                # One record per key, the first occurrence kept, whatever the input format
+                merged_data = read_dataframe(output_path)
+                expected = self.transformed_data.sort_values(['date', 'symbol', 'data_source'])
+                pd.testing.assert_frame_equal(
+                    merged_data.astype(self.timestamp_dtypes),
+                    expected[merged_data.columns].astype(self.timestamp_dtypes).reset_index(drop=True),
+                    check_dtype=False
+                )
+    def test_calculate_moving_averages_matches_per_symbol_rolling(self):
+        """Test the grouped moving averages against a rolling mean per symbol."""
+        rng = np.random.default_rng(0)
+        symbols = ['AAPL', 'MSFT', 'GOOGL']
+
+        # Interleaved symbols, so each symbol's rows are not contiguous
+        data = pd.DataFrame({
+            'date': np.repeat(pd.date_range('2023-01-02', periods=60, freq='B'), len(symbols)),
+            'symbol': pd.Categorical(symbols * 60),
+            'close': rng.uniform(100, 200, size=60 * len(symbols)),
+        })
+        windows = [5, 20]
+
+        # Test the function
+        result = calculate_moving_averages(data, windows=windows)
+
+        for symbol in symbols:
+            symbol_rows = data['symbol'] == symbol
+            for window in windows:
+                with self.subTest(symbol=symbol, window=window):
+                    expected = data.loc[symbol_rows, 'close'].rolling(window=window).mean().round(2)
+                    pd.testing.assert_series_equal(
+                        result.loc[symbol_rows, f'ma_{window}'], expected, check_names=False
+                    )
+
+    def test_transform_and_merge_schema_matches_bigquery(self):
+        """Test that the merged Parquet file has the BigQuery table's columns, types and modes."""
+        raw_columns = ['date', 'symbol', 'open', 'high', 'low', 'close', 'volume', 'data_source']
+        input_paths = {
+            source: write_dataframe(
+                data[raw_columns], os.path.join(self.temp_dir, f"{source}.parquet")
+            )
+            for source, data in self.transformed_data.groupby('data_source')
+        }
+        output_path = os.path.join(self.temp_dir, "merged.parquet")
+
+        # Test the function
+        transform_and_merge_stock_data(input_paths, output_path)
+
+        expected = pa.schema([
+            pa.field(field.name, BQ_ARROW_TYPES[field.field_type], nullable=field.mode != 'REQUIRED')
+            for field in STOCK_DATA_BQ_SCHEMA
+        ])
+        self.assertEqual(pq.read_schema(output_path).remove_metadata(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from dags.utils.validators import _group_min_max, validate_data_freshness, validate_raw_data, validate_transformed_data
+
+
+class TestValidators(unittest.TestCase):
+    """Test cases for data validation utilities."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by all tests, the tests don't modify them."""
+        rng = np.random.default_rng(0)
+
+        # Random groups and values, with missing values and an all-missing group
+        cls.group_codes = rng.integers(0, 50, size=1000)
+        cls.values = rng.normal(100, 10, size=1000)
+        cls.values[rng.random(1000) < 0.1] = np.nan
+        cls.values[cls.group_codes == 7] = np.nan
+
+    def test_group_min_max_matches_per_group_loop(self):
+        """Test the NumPy group reduction against a loop over the groups."""
+        n_groups = 50
+
+        min_values, max_values = _group_min_max(self.group_codes, self.values, n_groups)
+
+        for group in range(n_groups):
+            group_values = self.values[self.group_codes == group]
+            group_values = group_values[~np.isnan(group_values)]
+            with self.subTest(group=group):
+                if group_values.size:
+                    self.assertEqual(min_values[group], group_values.min())
+                    self.assertEqual(max_values[group], group_values.max())
+                else:
+                    # Groups without values keep the reduction's identity
+                    self.assertEqual(min_values[group], np.inf)
+                    self.assertEqual(max_values[group], -np.inf)
+
+    def test_price_inconsistency_matches_per_group_loop(self):
+        """Test the cross-source price check against a loop over symbols and dates."""
+        dates = pd.date_range('2023-09-01', periods=20, freq='B')
+        rng = np.random.default_rng(1)
+
+        df = pd.concat([
+            pd.DataFrame({
+                'date': dates,
+                'symbol': symbol,
+                'open': 100.0,
+                'high': 110.0,
+                'low': 90.0,
+                'close': 100 * rng.uniform(0.9, 1.1, size=len(dates)),
+                'volume': 1000,
+                'data_source': source,
+                'daily_change_pct': 0.0,
+                'daily_volatility': 1.0,
+                'processed_at': pd.Timestamp('2023-10-01', tz='UTC'),
+            })
+            for symbol in ['AAPL', 'MSFT']
+            for source in ['alpha_vantage', 'yahoo_finance']
+        ], ignore_index=True)
+        df['date'] = df['date'].dt.date
+
+        # The original check, one filter per symbol and date
+        expected = []
+        for symbol in df['symbol'].unique():
+            symbol_data = df[df['symbol'] == symbol]
+            for date in symbol_data['date'].unique():
+                close_prices = symbol_data[symbol_data['date'] == date]['close'].values
+                max_diff_pct = (max(close_prices) - min(close_prices)) / min(close_prices) * 100
+                if max_diff_pct > 5:
+                    expected.append(f"Price inconsistency for {symbol} on {date}: {max_diff_pct:.2f}% difference")
+
+        is_valid, results = validate_transformed_data(df)
+
+        self.assertTrue(is_valid, results['errors'])
+        self.assertTrue(expected)
+        self.assertEqual(
+            sorted(warning for warning in results['warnings'] if warning.startswith("Price inconsistency")),
+            sorted(expected)
+        )
+
+    def test_timezone_aware_dates(self):
+        """Test that timezone-aware dates are compared with today in UTC."""
+        dates = pd.bdate_range(end=pd.Timestamp.now().normalize() - pd.Timedelta(days=3), periods=3)
+        tomorrow = pd.Timestamp.now(tz='UTC').normalize() + pd.Timedelta(days=1)
+
+        for tz in ['UTC', 'America/New_York']:
+            with self.subTest(tz=tz):
+                df = pd.DataFrame({
+                    'date': dates.tz_localize(tz),
+                    'symbol': 'AAPL',
+                    'close': [181.15, 182.92, 183.40],
+                    'data_source': 'yahoo_finance',
+                })
+
+                is_valid, results = validate_raw_data(df)
+                self.assertTrue(is_valid, results['errors'])
+
+                is_valid, results = validate_data_freshness(df, max_age_days=30)
+                self.assertTrue(is_valid, results['errors'])
+
+                # A record after today is still caught
+                df.loc[len(df)] = [tomorrow.tz_convert(tz), 'AAPL', 184.0, 'yahoo_finance']
+                is_valid, results = validate_raw_data(df)
+                self.assertFalse(is_valid)
+                self.assertEqual(results['errors'], ["Found 1 records with future dates"])
+
+
+if __name__ == '__main__':
+    unittest.main()